@@ -0,0 +1,265 @@
+"""
+System-control latency benchmark
+Drives every volume, brightness, zoom and clipboard entry point against the
+fake osascript/pbpaste in benchmarks/fake_bin, which log each invocation with
+timestamps. Reports per action how many processes it spawned, its wall time
+and how much of that was spent sleeping (time.sleep in Elda plus `delay`
+steps inside the fake osascript).
+
+Each action starts from a fresh state (volume 50%, unknown brightness, 1x
+zoom) and gets --warmup untimed runs, so the timed runs look like a session
+in progress; pass --cold to reset before every run instead. Absolute levels
+alternate between two targets so no timed run is a no-op, and a run that
+spawns fewer processes than its action must is reported as a failure.
+
+Usage:
+    python benchmarks/control_benchmark.py --repeat 10 --save-baseline controls.json
+    python benchmarks/control_benchmark.py --baseline controls.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+from bench_utils import load_baseline, percentile, save_baseline
+
+CLIPBOARD_TEXT = "Elda reads the highlighted text aloud, one sentence at a time."
+
+
+def setup_environment(workdir, args):
+    """Put the fakes on PATH; must run before the control modules are imported"""
+    os.environ.update({
+        "PATH": os.path.join(BENCH_DIR, "fake_bin") + os.pathsep + os.environ.get("PATH", ""),
+        "ELDA_FAKE_LOG": os.path.join(workdir, "fake_calls.jsonl"),
+        "ELDA_FAKE_STATE": os.path.join(workdir, "fake_state.json"),
+        "ELDA_FAKE_OSASCRIPT_MS": str(args.osascript_ms),
+        "ELDA_FAKE_PBPASTE_MS": str(args.pbpaste_ms),
+        "ELDA_FAKE_CLIPBOARD": CLIPBOARD_TEXT,
+        # The fake can't stand in for the DisplayServices framework
+        "ELDA_BRIGHTNESS_BACKEND": "keys",
+    })
+
+
+class SleepMeter:
+    """Wraps time.sleep so deliberate waits inside Elda can be told apart from work"""
+
+    def __init__(self):
+        self.total = 0.0
+        self._sleep = time.sleep
+        self._lock = threading.Lock()
+
+    def install(self):
+        time.sleep = self.sleep
+
+    def sleep(self, seconds):
+        started = time.perf_counter()
+        try:
+            self._sleep(seconds)
+        finally:
+            with self._lock:
+                self.total += time.perf_counter() - started
+
+
+class ControlBench:
+    """Fresh control state per action and the fake-call log read back per run"""
+
+    def __init__(self, sleep_meter, verbose=False):
+        import volume
+        import brightness
+        from zoom_controller.zoom_controller import ZoomController
+
+        self.volume = volume
+        self.brightness = brightness
+        self.zoom_class = ZoomController
+        self.zoom = ZoomController()
+        self.sleep_meter = sleep_meter
+        self.verbose = verbose
+        self.log_path = os.environ["ELDA_FAKE_LOG"]
+
+    def reset(self):
+        """Back to volume 50%, an untracked brightness and 1x zoom"""
+        if os.path.exists(os.environ["ELDA_FAKE_STATE"]):
+            os.remove(os.environ["ELDA_FAKE_STATE"])
+        self.volume.volume_state = self.volume.VolumeState()
+        self.brightness.get_controller().level = None
+        self.zoom = self.zoom_class()
+
+    def actions(self):
+        """
+        (name, callable, minimum spawns per run) for every control entry point.
+        Only status reads may be served from the tracked state without a process.
+        """
+        import increasevolume
+        volume, brightness = self.volume, self.brightness
+
+        def alternate(*values):
+            # Each call gets the next target, so the control always has to move
+            return itertools.cycle(values).__next__
+        volume_level, brightness_level, zoom_level = alternate(40, 60), alternate(60, 30), alternate(2, 3)
+
+        def clipboard():
+            # read_highlight loads dotenv and the TTS settings, so only on first use
+            from read_highlight import get_clipboard_text
+            return get_clipboard_text()
+
+        return [
+            ("volume.parse_command up", lambda: volume.parse_command("increase volume by 10"), 1),
+            ("volume.parse_command down", lambda: volume.parse_command("decrease volume by 10"), 1),
+            ("volume.parse_command set", lambda: volume.parse_command(f"set volume to {volume_level()}"), 1),
+            ("volume.parse_command mute", lambda: volume.parse_command("mute"), 1),
+            ("volume.parse_command status", lambda: volume.parse_command("current volume"), 0),
+            ("volume.get_current_volume", volume.get_current_volume, 0),
+            ("volume.set_volume", lambda: volume.set_volume(volume_level()), 1),
+            ("volume.adjust_volume", lambda: volume.adjust_volume(-10), 1),
+            ("increasevolume.increase_volume", increasevolume.increase_volume, 1),
+            ("brightness.increase_brightness", brightness.increase_brightness, 1),
+            ("brightness.decrease_brightness", brightness.decrease_brightness, 1),
+            ("brightness.set_brightness", lambda: brightness.set_brightness(brightness_level()), 1),
+            ("zoom.zoom_in", lambda: self.zoom.zoom_in(3), 1),
+            ("zoom.zoom_out", lambda: self.zoom.zoom_out(3), 1),
+            ("zoom.zoom_to", lambda: self.zoom.zoom_to(zoom_level()), 1),
+            ("zoom.reset_zoom", lambda: self.zoom.reset_zoom(), 1),
+            ("zoom.zoom_toggle", lambda: self.zoom.zoom_toggle(), 1),
+            ("read_highlight.get_clipboard_text", clipboard, 2),
+        ]
+
+    def _calls_since(self, offset):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path) as f:
+            f.seek(offset)
+            return [json.loads(line) for line in f if line.strip()]
+
+    def measure(self, action):
+        """One timed run: {"wall_ms", "spawns", "sleep_ms"}"""
+        offset = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        slept_before = self.sleep_meter.total
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            action()
+        wall = time.perf_counter() - started
+        calls = self._calls_since(offset)
+        slept = self.sleep_meter.total - slept_before + sum(call.get("slept", 0.0) for call in calls)
+        return {"wall_ms": wall * 1000, "spawns": len(calls), "sleep_ms": slept * 1000}
+
+
+def run_action(bench, action, min_spawns, args):
+    """Samples of every timed run of one action; raises if a run did less than it must"""
+    bench.reset()
+    runs = []
+    for i in range(args.warmup + args.repeat):
+        if args.cold and i:
+            bench.reset()
+        sample = bench.measure(action)
+        if i < args.warmup:
+            continue
+        if sample["spawns"] < min_spawns:
+            raise RuntimeError(f"timed run {len(runs) + 1} spawned {sample['spawns']} processes, "
+                               f"expected at least {min_spawns}; it measured a no-op")
+        runs.append(sample)
+    return runs
+
+
+def summarize(runs):
+    walls = [run["wall_ms"] for run in runs]
+    return {
+        "p50_ms": percentile(walls, 50),
+        "p95_ms": percentile(walls, 95),
+        "spawns": sum(run["spawns"] for run in runs) / len(runs),
+        "sleep_ms": sum(run["sleep_ms"] for run in runs) / len(runs),
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Returns a list of human-readable regressions against the baseline"""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for key in ("p50_ms", "p95_ms", "sleep_ms"):
+            delta = current[key] - before[key]
+            if delta > min_delta_ms and current[key] > before[key] * (1 + threshold):
+                regressions.append(f"{name} {key}: {before[key]:.0f} → {current[key]:.0f} ms (+{delta:.0f} ms)")
+        # Spawn counts are deterministic, so any extra process is a regression
+        if current["spawns"] > before["spawns"] + 0.01:
+            regressions.append(f"{name} spawns: {before['spawns']:g} → {current['spawns']:g} per run")
+    return regressions
+
+
+def print_report(results, repeat, baseline=None):
+    print("\n" + "=" * 78)
+    print(f"CONTROL BENCHMARK ({repeat} timed runs per action)")
+    print("=" * 78)
+    print(f"{'action':<36} {'p50 ms':>8} {'p95 ms':>8} {'spawns':>7} {'sleep ms':>9} {'base p50':>8}")
+    print("-" * 78)
+    for name, result in results.items():
+        base = f"{baseline[name]['p50_ms']:.0f}" if baseline and name in baseline else ""
+        print(f"{name:<36} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} "
+              f"{result['spawns']:>7g} {result['sleep_ms']:>9.0f} {base:>8}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time Elda's system controls against fake osascript/pbpaste")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per action")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per action before timing")
+    parser.add_argument("--cold", action="store_true", help="reset the tracked volume/brightness/zoom before every run")
+    parser.add_argument("--only", action="append", help="run only actions whose name contains this (repeatable)")
+    parser.add_argument("--osascript-ms", type=float, default=40.0, help="simulated osascript startup cost")
+    parser.add_argument("--pbpaste-ms", type=float, default=5.0, help="simulated pbpaste startup cost")
+    parser.add_argument("--verbose", action="store_true", help="show what the controls print")
+    parser.add_argument("--baseline", help="compare against a saved baseline JSON")
+    parser.add_argument("--save-baseline", help="write this run's results as a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown per action")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="elda-controls-")
+    setup_environment(workdir, args)
+    sleep_meter = SleepMeter()
+    sleep_meter.install()
+    bench = ControlBench(sleep_meter, verbose=args.verbose)
+
+    results = {}
+    failed = []
+    for name, action, min_spawns in bench.actions():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        try:
+            results[name] = summarize(run_action(bench, action, min_spawns, args))
+        except Exception as e:
+            print(f"✗ {name} failed: {e}")
+            failed.append(name)
+        else:
+            print(f"⏱️ {name}: p50 {results[name]['p50_ms']:.0f} ms")
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print_report(results, args.repeat, baseline)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if failed:
+        print(f"\n❌ {len(failed)} action(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
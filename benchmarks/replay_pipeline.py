@@ -0,0 +1,330 @@
+"""
+Offline end-to-end replay benchmark for the voice pipeline
+Feeds recorded WAV commands through the real listen_and_process
+(capture → transcribe_whisper → detect_intent → handle_command → announce)
+with local stand-ins for Whisper, Gemini and ElevenLabs and a fake osascript
+on PATH, then reports per-stage latency percentiles.
+
+Corpus: a folder of name.wav (16 kHz mono) + name.txt (what is said)
++ optional name.intent (what the stub Gemini should answer).
+
+Usage:
+    python benchmarks/replay_pipeline.py recordings/ --repeat 3 --save-baseline baseline.json
+    python benchmarks/replay_pipeline.py recordings/ --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+import numpy as np
+
+from bench_utils import load_baseline, percentile, save_baseline
+from speech2text.audio_buffer import decode_wav
+from stub_servers import (
+    StubElevenLabsHandler, StubGeminiHandler, StubWhisperHandler,
+    WhisperCorpus, load_intents, start_server,
+)
+
+STAGES = ["endpoint", "stt", "intent", "action", "tts", "playback", "time_to_audio", "total"]
+
+
+def setup_environment(corpus_dir, workdir, args):
+    """
+    Start the stand-in servers and point Elda at them. Must run before the
+    pipeline modules are imported, since they read their settings at import.
+    """
+    _, whisper_url = start_server(
+        StubWhisperHandler,
+        corpus=WhisperCorpus(corpus_dir),
+        latency_ms=args.whisper_ms,
+        latency_per_second_ms=args.whisper_per_second_ms,
+    )
+    _, gemini_url = start_server(StubGeminiHandler, intents=load_intents(corpus_dir), latency_ms=args.gemini_ms)
+    _, elevenlabs_url = start_server(
+        StubElevenLabsHandler,
+        latency_ms=args.elevenlabs_ms,
+        stream_latency_ms=args.elevenlabs_first_chunk_ms,
+    )
+
+    os.environ.update({
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"{whisper_url}/v1",
+        "ELDA_STT_BACKEND": "openai",
+        "GEMINI_API_KEY": "stub",
+        "GEMINI_BASE_URL": gemini_url,
+        "ELEVENLABS_API_KEY": "stub",
+        "ELEVENLABS_BASE_URL": f"{elevenlabs_url}/v1",
+        "PATH": os.path.join(BENCH_DIR, "fake_bin") + os.pathsep + os.environ.get("PATH", ""),
+        "ELDA_FAKE_LOG": os.path.join(workdir, "fake_calls.jsonl"),
+        "ELDA_FAKE_STATE": os.path.join(workdir, "fake_state.json"),
+        "ELDA_FAKE_OSASCRIPT_MS": str(args.osascript_ms),
+        # A fresh TTS cache per run, so results don't depend on earlier runs
+        "ELDA_TTS_CACHE_DIR": os.path.join(workdir, "tts_cache"),
+    })
+    if args.stt_mode:
+        os.environ["ELDA_STT_MODE"] = args.stt_mode
+    if args.tts_mode:
+        os.environ["ELDA_TTS_STREAMING"] = "1" if args.tts_mode == "streaming" else "0"
+    if not args.real_audio:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+class ReplayFeeder(threading.Thread):
+    """Plays a recording into the microphone ring buffer in (scaled) real time"""
+
+    def __init__(self, mic, samples, speed=1.0, noise=30):
+        super().__init__(daemon=True)
+        self.mic = mic
+        self.samples = samples
+        self.speed = speed
+        self.noise = noise
+        self.speech_end = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        block = self.mic.blocksize
+        interval = block / self.mic.samplerate / self.speed
+        next_tick = time.perf_counter()
+        for i in range(0, len(self.samples), block):
+            self.mic.ring.write(self.samples[i:i + block])
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+        self.speech_end = time.perf_counter()
+
+        # Room tone afterwards so the endpointer can hear the user stop
+        rng = np.random.default_rng(0)
+        while not self._stop_event.is_set():
+            self.mic.ring.write(rng.normal(0, self.noise, block).astype(np.int16))
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class StageRecorder:
+    """Wraps pipeline functions in place and records when each one runs"""
+
+    def __init__(self):
+        self.events = {}
+
+    def reset(self):
+        self.events = {"tts": 0.0, "playback": 0.0, "inline": 0.0, "first_audio": None}
+
+    def wrap(self, owner, name, on_start=None, on_end=None):
+        original = getattr(owner, name)
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            if on_start:
+                on_start(started)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                if on_end:
+                    on_end(started, time.perf_counter())
+
+        setattr(owner, name, wrapper)
+
+    def mark(self, key):
+        return lambda *times: self.events.__setitem__(key, times[-1])
+
+    def accumulate(self, key):
+        def record(started, ended):
+            self.events[key] += ended - started
+            # Speech on the main thread held up handle_command; queued speech did not
+            if threading.current_thread() is threading.main_thread():
+                self.events["inline"] += ended - started
+        return record
+
+    def first_audio(self, started):
+        if self.events["first_audio"] is None:
+            self.events["first_audio"] = started
+
+
+def instrument(stt_capture, tts_announcer):
+    recorder = StageRecorder()
+    recorder.wrap(stt_capture, "record_until_silence", on_end=recorder.mark("capture_done"))
+    recorder.wrap(stt_capture, "detect_intent",
+                  on_start=recorder.mark("intent_start"), on_end=recorder.mark("intent_end"))
+    recorder.wrap(stt_capture, "handle_command",
+                  on_start=recorder.mark("handle_start"), on_end=recorder.mark("handle_end"))
+    recorder.wrap(tts_announcer.EldaTTSAnnouncer, "_generate_speech", on_end=recorder.accumulate("tts"))
+    recorder.wrap(tts_announcer.EldaTTSAnnouncer, "_play_audio",
+                  on_start=recorder.first_audio, on_end=recorder.accumulate("playback"))
+    # Streamed speech downloads while it plays, so all of it counts as playback
+    recorder.wrap(tts_announcer.EldaTTSAnnouncer, "_stream_speech", on_end=recorder.accumulate("playback"))
+    recorder.wrap(tts_announcer.EldaTTSAnnouncer, "_first_audio", on_start=recorder.first_audio)
+    recorder.wrap(tts_announcer.EldaTTSAnnouncer, "speak", on_end=recorder.mark("spoken"))
+    return recorder
+
+
+def stage_times(events, speech_end):
+    """Per-stage seconds for one utterance, or None if the pipeline stopped early"""
+    if "handle_end" not in events:
+        return None
+    handle = events["handle_end"] - events["handle_start"]
+    # Announcements are queued, so the utterance is over once Elda stops talking
+    finished = max(events["handle_end"], events.get("spoken", 0.0))
+    return {
+        "endpoint": events["capture_done"] - speech_end,
+        "stt": events["intent_start"] - events["capture_done"],
+        "intent": events["intent_end"] - events["intent_start"],
+        "action": handle - events["inline"],
+        "tts": events["tts"],
+        "playback": events["playback"],
+        "time_to_audio": (events["first_audio"] or events["handle_end"]) - speech_end,
+        "total": finished - speech_end,
+    }
+
+
+def summarize(samples_by_stage):
+    return {
+        stage: {
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+        }
+        for stage, values in samples_by_stage.items() if values
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Returns a list of human-readable regressions against the baseline"""
+    regressions = []
+    for stage, current in results.items():
+        before = baseline.get(stage)
+        if not before:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            delta = current[key] - before[key]
+            if delta > min_delta_ms and current[key] > before[key] * (1 + threshold):
+                regressions.append(f"{stage} {key}: {before[key]:.0f} → {current[key]:.0f} ms (+{delta:.0f} ms)")
+    return regressions
+
+
+def print_report(results, utterances, spawns, baseline=None):
+    print("\n" + "=" * 60)
+    print(f"REPLAY BENCHMARK ({utterances} utterances, {spawns} osascript spawns)")
+    print("=" * 60)
+    print(f"{'stage':<15} {'p50 ms':>9} {'p95 ms':>9} {'base p50':>10}")
+    print("-" * 60)
+    for stage in STAGES:
+        if stage not in results:
+            continue
+        base = f"{baseline[stage]['p50_ms']:.0f}" if baseline and stage in baseline else ""
+        print(f"{stage:<15} {results[stage]['p50_ms']:>9.0f} {results[stage]['p95_ms']:>9.0f} {base:>10}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded commands through the full Elda pipeline offline")
+    parser.add_argument("corpus", help="folder of name.wav + name.txt (+ name.intent) files")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="count the first utterance too (it pays client and audio setup)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1.0 = real time)")
+    parser.add_argument("--stt-mode", choices=["batch", "streaming"], help="override ELDA_STT_MODE")
+    parser.add_argument("--whisper-ms", type=float, default=300.0)
+    parser.add_argument("--whisper-per-second-ms", type=float, default=50.0)
+    parser.add_argument("--gemini-ms", type=float, default=400.0)
+    parser.add_argument("--elevenlabs-ms", type=float, default=250.0)
+    parser.add_argument("--elevenlabs-first-chunk-ms", type=float, default=120.0,
+                        help="time to the first chunk of a streamed synthesis")
+    parser.add_argument("--tts-mode", choices=["full", "streaming"], help="override ELDA_TTS_STREAMING")
+    parser.add_argument("--osascript-ms", type=float, default=40.0, help="simulated osascript startup cost")
+    parser.add_argument("--tts-prewarm", action="store_true", help="prewarm the TTS cache before replaying")
+    parser.add_argument("--real-audio", action="store_true", help="play announcements on the real output device")
+    parser.add_argument("--baseline", help="compare against a saved baseline JSON")
+    parser.add_argument("--save-baseline", help="write this run's results as a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown per stage")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="elda-replay-")
+    setup_environment(args.corpus, workdir, args)
+
+    # Imported only now so they pick up the stub endpoints
+    import tts_announcer
+    import tts_queue
+    from speech2text import stt_capture
+    from speech2text.mic_stream import MicrophoneStream
+
+    recordings = []
+    for name in sorted(os.listdir(args.corpus)):
+        if name.endswith(".wav"):
+            samples, fs = decode_wav(os.path.join(args.corpus, name))
+            if fs != 16000:
+                sys.exit(f"{name}: expected 16 kHz audio, got {fs} Hz")
+            recordings.append((name, samples))
+    if not recordings:
+        sys.exit(f"No WAV files found in {args.corpus}")
+
+    if args.tts_prewarm:
+        stt_capture.prewarm_announcements()
+
+    recorder = instrument(stt_capture, tts_announcer)
+    mic = MicrophoneStream(samplerate=16000, blocksize=512)  # never started; the feeder fills it
+    samples_by_stage = {stage: [] for stage in STAGES}
+    completed = 0
+
+    # An untimed first pass over one recording keeps client/mixer setup out of the numbers
+    schedule = [] if args.no_warmup else [(recordings[0], False)]
+    schedule += [(recording, True) for _ in range(args.repeat) for recording in recordings]
+
+    for (name, samples), counted in schedule:
+        print(f"\n▶️ Replaying {name}" + ("" if counted else " (warm-up)"))
+        recorder.reset()
+        feeder = ReplayFeeder(mic, samples, speed=args.speed)
+        start = mic.ring.written
+        feeder.start()
+        try:
+            stt_capture.listen_and_process(mic=mic, start=start)
+            tts_queue.get_queue().wait_idle()
+        finally:
+            feeder.stop()
+
+        times = stage_times(recorder.events, feeder.speech_end)
+        if not counted:
+            continue
+        if times is None:
+            print(f"⚠️ {name} did not reach handle_command")
+            continue
+        completed += 1
+        for stage, value in times.items():
+            samples_by_stage[stage].append(value)
+
+    spawns = 0
+    if os.path.exists(os.environ["ELDA_FAKE_LOG"]):
+        with open(os.environ["ELDA_FAKE_LOG"]) as f:
+            spawns = sum(1 for _ in f)
+
+    results = summarize(samples_by_stage)
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print_report(results, completed, spawns, baseline)
+    for tier, summary in tts_announcer.get_announcer().tier_summary().items():
+        print(f"🗣️ TTS {tier:<7} {summary['count']:>4} utterances, "
+              f"p50 {summary['p50_ms']:.0f} ms, max {summary['max_ms']:.0f} ms to first audio")
+    pcm = tts_announcer.get_announcer().pcm_stats()
+    if pcm:
+        print(f"🎛️ Decoded audio: {pcm['decodes']} decodes in {pcm['decode_ms']:.0f} ms, "
+              f"{pcm['hits']} replays from memory, {pcm['clips']} clips / {pcm['resident_mb']:.1f} MB resident")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
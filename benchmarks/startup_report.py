@@ -0,0 +1,106 @@
+"""
+Import-time breakdown for Elda's startup path
+Imports a module in a fresh interpreter with -X importtime and reports where
+the milliseconds go, per module and per top-level package
+
+Usage:
+    python benchmarks/startup_report.py                       # speech2text.stt_capture
+    python benchmarks/startup_report.py --module tts_announcer --top 30
+    python benchmarks/startup_report.py --save-baseline startup.json
+    python benchmarks/startup_report.py --baseline startup.json --threshold 0.25
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.join(BENCH_DIR, "..")
+
+from bench_utils import load_baseline, save_baseline
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def measure_imports(module):
+    """Returns [(module name, depth, self ms, cumulative ms)] in import order"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, len(indent) // 2, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return entries
+
+
+def by_package(entries):
+    """Self time summed per top-level package"""
+    totals = {}
+    for name, _, self_ms, _ in entries:
+        root = name.split(".")[0]
+        totals[root] = totals.get(root, 0.0) + self_ms
+    return totals
+
+
+def print_report(module, entries, top):
+    total = next((cum for name, _, _, cum in entries if name == module), sum(e[2] for e in entries))
+    print("=" * 64)
+    print(f"IMPORT TIME: {module} — {total:.0f} ms total")
+    print("=" * 64)
+
+    print(f"\n{'module':<44} {'self ms':>8} {'cum ms':>8}")
+    print("-" * 64)
+    for name, depth, self_ms, cumulative in sorted(entries, key=lambda e: -e[3])[:top]:
+        print(f"{name[:44]:<44} {self_ms:>8.1f} {cumulative:>8.1f}")
+
+    print(f"\n{'package':<44} {'self ms':>8}")
+    print("-" * 64)
+    packages = by_package(entries)
+    for root, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{root:<44} {ms:>8.1f}")
+
+    return {"total_ms": total, "packages": packages}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-module import time report")
+    parser.add_argument("--module", default="speech2text.stt_capture", help="module to import")
+    parser.add_argument("--top", type=int, default=20, help="rows to show per table")
+    parser.add_argument("--baseline", help="compare against a saved baseline JSON")
+    parser.add_argument("--save-baseline", help="write this run's results as a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=15.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    results = print_report(args.module, measure_imports(args.module), args.top)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        pairs = [("total", baseline["total_ms"], results["total_ms"])]
+        pairs += [(root, ms, results["packages"].get(root, 0.0)) for root, ms in baseline["packages"].items()]
+        pairs += [(root, 0.0, ms) for root, ms in results["packages"].items() if root not in baseline["packages"]]
+
+        regressions = [
+            f"{name}: {before:.0f} → {after:.0f} ms"
+            for name, before, after in pairs
+            if after - before > args.min_delta_ms and after > before * (1 + args.threshold)
+        ]
+        if regressions:
+            print("\n❌ Import-time regressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ No import-time regressions against baseline")
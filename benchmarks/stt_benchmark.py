@@ -0,0 +1,100 @@
+"""
+STT backend benchmark
+Runs every WAV in a directory through each backend and reports real-time
+factor, p50/p95 latency and word error rate (against name.txt transcripts)
+
+Usage:
+    python benchmarks/stt_benchmark.py recordings/ --backends openai local
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_utils import percentile, word_error_rate
+from speech2text.audio_buffer import decode_wav, encode_wav
+from speech2text.stt_backends import available_backends, get_backend
+
+
+def load_corpus(directory):
+    """Returns [(name, samples, fs, reference transcript or None)]"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".wav"):
+            continue
+        samples, fs = decode_wav(os.path.join(directory, name))
+        transcript_path = os.path.join(directory, name[:-4] + ".txt")
+        reference = None
+        if os.path.exists(transcript_path):
+            with open(transcript_path) as f:
+                reference = f.read().strip()
+        corpus.append((name, samples, fs, reference))
+    return corpus
+
+
+def benchmark_backend(backend_name, corpus, warmup=True):
+    """Transcribe the corpus with one backend and summarize the results"""
+    load_started = time.perf_counter()
+    backend = get_backend(backend_name)
+    load_time = time.perf_counter() - load_started
+
+    if warmup and corpus:
+        # First call pays model/connection setup; keep it out of the latency numbers
+        _, samples, fs, _ = corpus[0]
+        backend.transcribe(encode_wav(samples, fs))
+
+    latencies, audio_seconds, errors = [], 0.0, []
+    for name, samples, fs, reference in corpus:
+        started = time.perf_counter()
+        text = backend.transcribe(encode_wav(samples, fs))
+        latencies.append(time.perf_counter() - started)
+        audio_seconds += len(samples) / fs
+        if reference is not None:
+            errors.append(word_error_rate(reference, text))
+        print(f"  {name}: {latencies[-1] * 1000:.0f} ms → {text!r}")
+
+    return {
+        "backend": backend_name,
+        "files": len(corpus),
+        "load_s": load_time,
+        "rtf": sum(latencies) / audio_seconds if audio_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "wer": sum(errors) / len(errors) if errors else None,
+    }
+
+
+def print_report(results):
+    print("\n" + "=" * 72)
+    print(f"{'backend':<10} {'files':>5} {'load s':>8} {'RTF':>7} {'p50 ms':>9} {'p95 ms':>9} {'WER':>7}")
+    print("-" * 72)
+    for r in results:
+        wer = f"{r['wer'] * 100:.1f}%" if r["wer"] is not None else "n/a"
+        print(f"{r['backend']:<10} {r['files']:>5} {r['load_s']:>8.2f} {r['rtf']:>7.3f} "
+              f"{r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f} {wer:>7}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark STT backends over a directory of WAV files")
+    parser.add_argument("directory", help="folder of name.wav files with optional name.txt transcripts")
+    parser.add_argument("--backends", nargs="+", default=available_backends(), choices=available_backends())
+    parser.add_argument("--no-warmup", action="store_true", help="include the first (cold) call in the numbers")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.directory)
+    if not corpus:
+        sys.exit(f"No WAV files found in {args.directory}")
+
+    results = []
+    for backend_name in args.backends:
+        print(f"\n🏁 Benchmarking '{backend_name}' on {len(corpus)} files...")
+        try:
+            results.append(benchmark_backend(backend_name, corpus, warmup=not args.no_warmup))
+        except Exception as e:
+            print(f"✗ {backend_name} failed: {e}")
+
+    print_report(results)
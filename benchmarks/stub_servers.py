@@ -0,0 +1,304 @@
+"""
+Local stand-in servers for the cloud APIs Elda talks to
+Lets the pipeline run offline with controllable latency
+
+Usage:
+    python benchmarks/stub_servers.py whisper --port 8901 --corpus recordings/ --latency-ms 300
+    OPENAI_BASE_URL=http://127.0.0.1:8901/v1 ELDA_STT_MODE=streaming python voice.py
+
+    python benchmarks/stub_servers.py gemini --port 8902 --corpus recordings/   # GEMINI_BASE_URL=http://127.0.0.1:8902
+    python benchmarks/stub_servers.py elevenlabs --port 8903                    # ELEVENLABS_BASE_URL=http://127.0.0.1:8903/v1
+"""
+
+import argparse
+import email.parser
+import email.policy
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from speech2text.audio_buffer import decode_wav, encode_wav
+
+
+def _parse_multipart(content_type, body):
+    """Returns {field name: bytes} for a multipart/form-data body"""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = part.get_payload(decode=True)
+    return fields
+
+
+class WhisperCorpus:
+    """
+    Known recordings and their transcripts (name.wav + name.txt).
+    Lets the stub answer for a whole clip or any chunk cut out of one.
+    """
+
+    def __init__(self, directory=None, default_text=""):
+        self.default_text = default_text
+        self.clips = []
+        if directory:
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".wav"):
+                    continue
+                transcript_path = os.path.join(directory, name[:-4] + ".txt")
+                if not os.path.exists(transcript_path):
+                    continue
+                samples, fs = decode_wav(os.path.join(directory, name))
+                with open(transcript_path) as f:
+                    self.clips.append((samples.tobytes(), fs, f.read().strip()))
+
+    def _locate(self, samples, clip_bytes):
+        """Sample offset of this audio within a clip (may be negative if it starts earlier)"""
+        # Probe a few spots, since the upload may begin with pre-roll the clip doesn't have
+        for offset in range(0, max(1, len(samples) - 64), 400):
+            probe = samples[offset:offset + 64].tobytes()
+            index = clip_bytes.find(probe)
+            while index != -1 and index % 2:
+                index = clip_bytes.find(probe, index + 1)
+            if index != -1:
+                return index // 2 - offset
+        return None
+
+    def lookup(self, samples, fs):
+        """Transcript for the words whose midpoint falls inside this audio"""
+        if not len(samples):
+            return ""
+        for clip_bytes, clip_fs, transcript in self.clips:
+            if clip_fs != fs:
+                continue
+            position = self._locate(samples, clip_bytes)
+            if position is None:
+                continue
+
+            clip_duration = len(clip_bytes) / 2 / clip_fs
+            start = position / fs
+            end = start + len(samples) / fs
+            words = transcript.split()
+            return " ".join(
+                word for i, word in enumerate(words)
+                if start <= (i + 0.5) / len(words) * clip_duration < end
+            )
+        return self.default_text
+
+
+class StubWhisperHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/audio/transcriptions like the OpenAI API"""
+
+    corpus = WhisperCorpus()
+    latency_ms = 300.0
+    latency_per_second_ms = 0.0
+    requests_served = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/audio/transcriptions"):
+            self.send_error(404)
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        fields = _parse_multipart(self.headers["Content-Type"], body)
+        samples, fs = decode_wav(io.BytesIO(fields.get("file", b"")))
+
+        # Simulated upload + inference time: a fixed cost plus a per-audio-second cost
+        audio_seconds = len(samples) / fs
+        time.sleep((self.latency_ms + self.latency_per_second_ms * audio_seconds) / 1000)
+        type(self).requests_served += 1
+
+        payload = json.dumps({"text": self.corpus.lookup(samples, fs)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def load_intents(directory):
+    """Expected intent per transcript, from name.txt + name.intent pairs"""
+    intents = {}
+    if directory:
+        for name in os.listdir(directory):
+            if not name.endswith(".intent"):
+                continue
+            transcript_path = os.path.join(directory, name[:-7] + ".txt")
+            if os.path.exists(transcript_path):
+                with open(transcript_path) as t, open(os.path.join(directory, name)) as i:
+                    intents[t.read().strip().lower()] = i.read().strip()
+    return intents
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1beta/models/<model>:generateContent like the Gemini API"""
+
+    intents = {}
+    default_intent = "other"
+    latency_ms = 400.0
+    requests_served = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        prompt = " ".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        match = re.search(r'A user said: "(.*?)"', prompt, re.S)
+        said = match.group(1).strip().lower() if match else ""
+
+        time.sleep(self.latency_ms / 1000)
+        type(self).requests_served += 1
+
+        payload = json.dumps({
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": self.intents.get(said, self.default_intent)}]},
+                "finishReason": "STOP",
+            }]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class StubElevenLabsHandler(BaseHTTPRequestHandler):
+    """
+    Answers POST /v1/text-to-speech/<voice_id> with a WAV of near-silence whose
+    length follows the text, so playback takes a realistic amount of time.
+    POST .../<voice_id>/stream?output_format=pcm_<rate> sends raw PCM with
+    chunked transfer encoding, paced like a synthesizer running faster than
+    real time.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive and chunked responses, like the real API
+    latency_ms = 250.0
+    stream_latency_ms = 120.0  # time to the first streamed chunk
+    realtime_factor = 3.0      # streamed audio arrives this many times faster than it plays
+    chars_per_second = 15.0
+    sample_rate = 22050
+    requests_served = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def silence(self, text, sample_rate):
+        duration = max(0.2, len(text) / self.chars_per_second)
+        return np.zeros(int(duration * sample_rate), dtype=np.int16)
+
+    def synthesize(self, text):
+        return encode_wav(self.silence(text, self.sample_rate), self.sample_rate).getvalue()
+
+    def do_POST(self):
+        path, _, query = self.path.partition("?")
+        if "/text-to-speech/" not in path:
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if path.endswith("/stream"):
+            self.stream(body.get("text", ""), parse_qs(query).get("output_format", ["pcm_22050"])[0])
+            return
+
+        time.sleep(self.latency_ms / 1000)
+        type(self).requests_served += 1
+
+        audio = self.synthesize(body.get("text", ""))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+    def stream(self, text, output_format):
+        if not output_format.startswith("pcm_"):
+            self.send_error(400, "The stub only streams pcm_<rate>")
+            return
+        sample_rate = int(output_format.split("_")[1])
+        time.sleep(self.stream_latency_ms / 1000)
+        type(self).requests_served += 1
+
+        audio = self.silence(text, sample_rate).tobytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunk_seconds = 0.1
+        chunk_bytes = int(sample_rate * chunk_seconds) * 2
+        for offset in range(0, len(audio), chunk_bytes):
+            piece = audio[offset:offset + chunk_bytes]
+            self.wfile.write(f"{len(piece):X}\r\n".encode() + piece + b"\r\n")
+            self.wfile.flush()
+            time.sleep(chunk_seconds / self.realtime_factor)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def start_server(handler, port=0, **settings):
+    """
+    Start a stub server on a background thread. Settings override the handler's
+    class attributes (e.g. latency_ms). Returns (server, root_url).
+    """
+    handler = type(handler.__name__, (handler,), dict(settings))
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+STUBS = {
+    "whisper": StubWhisperHandler,
+    "gemini": StubGeminiHandler,
+    "elevenlabs": StubElevenLabsHandler,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for a cloud API")
+    parser.add_argument("service", choices=sorted(STUBS))
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fixed latency per request")
+    parser.add_argument("--latency-per-second-ms", type=float, default=0.0,
+                        help="extra latency per second of uploaded audio (whisper)")
+    parser.add_argument("--first-chunk-ms", type=float, default=120.0,
+                        help="time to the first chunk of a streamed synthesis (elevenlabs)")
+    parser.add_argument("--corpus", help="directory of name.wav + name.txt (+ name.intent for gemini) files")
+    parser.add_argument("--text", default="", help="transcript returned for unknown audio (whisper)")
+    args = parser.parse_args()
+
+    settings = {"latency_ms": args.latency_ms}
+    if args.service == "whisper":
+        settings["corpus"] = WhisperCorpus(args.corpus, default_text=args.text)
+        settings["latency_per_second_ms"] = args.latency_per_second_ms
+    elif args.service == "gemini":
+        settings["intents"] = load_intents(args.corpus)
+    elif args.service == "elevenlabs":
+        settings["stream_latency_ms"] = args.first_chunk_ms
+
+    server, root_url = start_server(STUBS[args.service], args.port, **settings)
+    print(f"🧪 Stub {args.service} API listening on {root_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,68 +1,269 @@
+"""
+Screen brightness control
+Sets the display to an absolute level and remembers it, instead of pressing
+the brightness keys blindly. Uses the DisplayServices framework in-process
+when available, the `brightness` command-line tool otherwise, and falls back
+to batched key presses (one osascript call) with an estimated level.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import shutil
+import statistics
 import subprocess
+import threading
 import time
+from collections import deque
+
+from script_executor import batch
+
+BACKEND = os.getenv("ELDA_BRIGHTNESS_BACKEND", "auto")  # "auto", "displayservices", "cli" or "keys"
+BRIGHTNESS_TTL = float(os.getenv("ELDA_BRIGHTNESS_TTL", "10"))  # seconds the cached level is trusted
+RAMP = os.getenv("ELDA_BRIGHTNESS_RAMP", "1") == "1"  # ease into the new level instead of jumping
+RAMP_MS = float(os.getenv("ELDA_BRIGHTNESS_RAMP_MS", "120"))
+RAMP_FRAMES = 8
+DEFAULT_STEP = 0.25
+
+# Brightness keys (F1/F2 on built-in keyboards); F15/F14 = "107,113" on some external ones
+UP_KEY, DOWN_KEY = (int(code) for code in os.getenv("ELDA_BRIGHTNESS_KEYS", "144,145").split(","))
+KEY_STEPS = 16  # one key press moves brightness by 1/16
+KEY_DELAY = 0.05
+
+
+class DisplayServicesBackend:
+    """The private DisplayServices API that the brightness keys use; microseconds per call"""
+
+    name = "displayservices"
+    readable = True
+
+    def __init__(self):
+        self._ds = ctypes.CDLL("/System/Library/PrivateFrameworks/DisplayServices.framework/DisplayServices")
+        graphics = ctypes.CDLL(ctypes.util.find_library("CoreGraphics") or "CoreGraphics")
+        graphics.CGMainDisplayID.restype = ctypes.c_uint32
+        self._display = graphics.CGMainDisplayID()
+        self._ds.DisplayServicesGetBrightness.argtypes = [ctypes.c_uint32, ctypes.POINTER(ctypes.c_float)]
+        self._ds.DisplayServicesSetBrightness.argtypes = [ctypes.c_uint32, ctypes.c_float]
+        self.get()  # fails here if the main display has no software brightness
+
+    def get(self):
+        value = ctypes.c_float()
+        status = self._ds.DisplayServicesGetBrightness(self._display, ctypes.byref(value))
+        if status:
+            raise OSError(f"DisplayServicesGetBrightness failed ({status})")
+        return value.value
+
+    def set(self, level, current=None, ramp=False):
+        if ramp and current is not None:
+            # A few in-process writes along the way; no subprocesses involved
+            for frame in range(1, RAMP_FRAMES):
+                self._write(current + (level - current) * frame / RAMP_FRAMES)
+                time.sleep(RAMP_MS / 1000 / RAMP_FRAMES)
+        self._write(level)
+        return level
+
+    def _write(self, level):
+        status = self._ds.DisplayServicesSetBrightness(self._display, ctypes.c_float(level))
+        if status:
+            raise OSError(f"DisplayServicesSetBrightness failed ({status})")
+
+
+class BrightnessCLIBackend:
+    """The `brightness` tool (brew install brightness); one subprocess per call"""
+
+    name = "brightness-cli"
+    readable = True
+
+    def __init__(self):
+        self.path = shutil.which("brightness")
+        if not self.path:
+            raise OSError("brightness command not found")
+
+    def get(self):
+        output = subprocess.run([self.path, "-l"], capture_output=True, text=True, check=True).stdout
+        match = re.search(r"display 0: brightness ([\d.]+)", output)
+        if not match:
+            raise OSError(f"Unexpected brightness output: {output.strip()}")
+        return float(match.group(1))
+
+    def set(self, level, current=None, ramp=False):
+        # Ramping would cost a process per frame, so this always jumps
+        subprocess.run([self.path, f"{level:.4f}"], check=True, capture_output=True)
+        return level
+
+
+class KeyPressBackend:
+    """
+    Brightness keys through one batched osascript call. macOS can't be asked
+    for the level this way, so it is tracked from the presses we send.
+
+    Limitation: an absolute level is reached from an assumed starting point
+    (ASSUMED_LEVEL) and may be off by the difference, so the controller keeps
+    the result as an estimate. Bottoming out first would make it exact, but
+    costs a second-long script and blacks out the screen partway through.
+    """
+
+    ASSUMED_LEVEL = 0.5
+
+    name = "keys"
+    readable = False
+
+    def _press(self, presses):
+        if not presses:
+            return
+        key = UP_KEY if presses > 0 else DOWN_KEY
+        script = batch()
+        for i in range(abs(presses)):
+            if i:
+                script.delay(KEY_DELAY)
+            script.key_code(key)
+        for step in script.run():
+            if not step.ok:
+                raise RuntimeError(f"{step.step} failed: {step.value}")
+
+    def get(self):
+        raise OSError("key presses can't read the brightness")
+
+    def set(self, level, current=None, ramp=False):
+        target = round(level * KEY_STEPS)
+        if current is None:
+            current = self.ASSUMED_LEVEL  # an estimate; see the class docstring
+        self._press(target - round(current * KEY_STEPS))
+        return target / KEY_STEPS
 
-def increase_brightness():
+    def nudge(self, delta):
+        """Relative change when the starting level is unknown"""
+        self._press(round(delta * KEY_STEPS))
+
+
+BACKENDS = {
+    "displayservices": DisplayServicesBackend,
+    "cli": BrightnessCLIBackend,
+    "keys": KeyPressBackend,
+}
+
+
+def pick_backend(name=None):
+    """The backend named by ELDA_BRIGHTNESS_BACKEND, or the fastest one that works here"""
+    name = name or BACKEND
+    if name != "auto":
+        return BACKENDS[name]()
+    for backend in (DisplayServicesBackend, BrightnessCLIBackend):
+        try:
+            return backend()
+        except (OSError, AttributeError):
+            continue
+    return KeyPressBackend()
+
+
+class BrightnessController:
+    """
+    Absolute brightness (0.0-1.0) with a cached current level and per-change
+    timing. `estimated` is True while the level comes from a guess rather than
+    a reading (key presses from an unknown level), so it can be reported as
+    approximate.
+    """
+
+    def __init__(self, backend=None, ttl=None, ramp=None):
+        self.backend = backend or pick_backend()
+        self.ttl = BRIGHTNESS_TTL if ttl is None else ttl
+        self.ramp = RAMP if ramp is None else ramp
+        self.level = None
+        self.estimated = False
+        self.checked_at = 0.0
+        self.stats = {"reads": 0, "writes": 0, "cache_hits": 0}
+        self.latencies_ms = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def _store(self, level, estimated=False):
+        self.level = level
+        self.estimated = estimated
+        self.checked_at = time.monotonic()
+
+    def _current(self):
+        """Cached level if fresh, else read it; None if it can't be known (lock held)"""
+        if self.level is not None and (time.monotonic() - self.checked_at < self.ttl or not self.backend.readable):
+            self.stats["cache_hits"] += 1
+            return self.level
+        if not self.backend.readable:
+            return None
+        self.stats["reads"] += 1
+        self._store(self.backend.get())
+        return self.level
+
+    def get(self):
+        with self._lock:
+            return self._current()
+
+    def set(self, level, ramp=None):
+        """Go to an absolute level in one command; returns the new level"""
+        level = max(0.0, min(1.0, level))
+        with self._lock:
+            started = time.perf_counter()
+            current = self._current()
+            self.stats["writes"] += 1
+            # From an unknown level the backend starts at a guess, and the result is only as good
+            estimated = current is None or self.estimated
+            self._store(self.backend.set(level, current=current, ramp=self.ramp if ramp is None else ramp),
+                        estimated)
+            self._report(started, current)
+            return self.level
+
+    def adjust(self, delta, ramp=None):
+        """Move by a relative amount (e.g. +0.25); returns the new level, or None if unknown"""
+        with self._lock:
+            started = time.perf_counter()
+            current = self._current()
+            self.stats["writes"] += 1
+            if current is None:
+                self.backend.nudge(delta)
+            else:
+                self._store(self.backend.set(max(0.0, min(1.0, current + delta)), current=current,
+                                             ramp=self.ramp if ramp is None else ramp), self.estimated)
+            self._report(started, current)
+            return self.level if current is not None else None
+
+    def _report(self, started, before):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.latencies_ms.append(elapsed_ms)
+        before = f"{before:.0%}" if before is not None else "?"
+        after = f"{'~' if self.estimated else ''}{self.level:.0%}" if self.level is not None else "?"
+        print(f"💡 Brightness {before} → {after} in {elapsed_ms:.0f} ms ({self.backend.name})")
+
+    def latency_report(self):
+        """{"count", "p50_ms", "max_ms"} over recent adjustments"""
+        latencies = list(self.latencies_ms)
+        if not latencies:
+            return {"count": 0}
+        return {"count": len(latencies), "p50_ms": statistics.median(latencies), "max_ms": max(latencies)}
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """The process-wide brightness controller, so the tracked level survives between commands"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = BrightnessController()
+        return _controller
+
+
+def set_brightness(percent):
+    """Set brightness to an absolute percentage (0-100)"""
+    return get_controller().set(percent / 100)
+
+
+def increase_brightness(amount=DEFAULT_STEP):
     """Increase brightness by 25%"""
-    print("🔆 Increasing brightness by 25%...")
-    
-    # Try multiple approaches to increase brightness
-    # Method 1: F1 key (key code 144) - most common for brightness up
-    for i in range(4):  # 4 presses for ~25% increase
-        subprocess.run([
-            "osascript", "-e",
-            'tell application "System Events" to key code 144'
-        ], check=False)
-        time.sleep(0.1)  # Small delay between presses
-    
-    # Method 2: If F1 doesn't work, try F15 (key code 107)
-    time.sleep(0.5)
-    for i in range(2):  # Backup method
-        subprocess.run([
-            "osascript", "-e",
-            'tell application "System Events" to key code 107'
-        ], check=False)
-        time.sleep(0.1)
-    
-    # Show native brightness overlay
-    subprocess.run([
-        "osascript", "-e", 
-        """
-        tell application "System Events"
-            key code 144 -- Trigger overlay
-            delay 0.2
-        end tell
-        """
-    ], check=False)
-
-def decrease_brightness():
+    print(f"🔆 Increasing brightness by {amount:.0%}...")
+    return get_controller().adjust(amount)
+
+
+def decrease_brightness(amount=DEFAULT_STEP):
     """Decrease brightness by 25%"""
-    print("🌙 Decreasing brightness by 25%...")
-    
-    # Try multiple approaches to decrease brightness
-    # Method 1: F2 key (key code 145) - most common for brightness down
-    for i in range(4):  # 4 presses for ~25% decrease
-        subprocess.run([
-            "osascript", "-e",
-            'tell application "System Events" to key code 145'
-        ], check=False)
-        time.sleep(0.1)  # Small delay between presses
-    
-    # Method 2: If F2 doesn't work, try F14 (key code 113)
-    time.sleep(0.5)
-    for i in range(2):  # Backup method
-        subprocess.run([
-            "osascript", "-e",
-            'tell application "System Events" to key code 113'
-        ], check=False)
-        time.sleep(0.1)
-    
-    # Show native brightness overlay
-    subprocess.run([
-        "osascript", "-e", 
-        """
-        tell application "System Events"
-            key code 145 -- Trigger overlay
-            delay 0.2
-        end tell
-        """
-    ], check=False)
\ No newline at end of file
+    print(f"🌙 Decreasing brightness by {amount:.0%}...")
+    return get_controller().adjust(-amount)
@@ -1,50 +1,225 @@
-import subprocess
-import requests
+"""
+Read highlighted text aloud
+Copies the current selection, splits it into sentence-sized chunks and reads
+them one after another. While one chunk plays the next ones are already being
+synthesized (bounded prefetch), so a long article starts talking after one
+sentence's worth of synthesis and never waits between chunks. Audio stays in
+memory, and reading can be paused, resumed or stopped.
+"""
+
+import io
 import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
 
+from script_executor import batch
+
 load_dotenv()
-ELEVEN_KEY = os.getenv("ELEVEN_KEY")  # Your ElevenLabs API key
 VOICE_ID = os.getenv("ELEVEN_VOICE_ID")  # Optional: choose a voice
+# Steadier than the announcements, which suits long passages
+VOICE_SETTINGS = {"stability": 0.7, "similarity_boost": 0.75}
+MAX_CHUNK_CHARS = int(os.getenv("ELDA_READ_CHUNK_CHARS", "400"))  # well under the API's request limit
+PREFETCH = int(os.getenv("ELDA_READ_PREFETCH", "2"))  # chunks synthesized ahead of the one playing
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+_current_reader = None
+_current_reading = None  # the queued announcement the reader runs as
+
 
 def get_clipboard_text():
     """Grabs the currently highlighted/copied text on macOS."""
-    # Simulate Cmd+C to copy selection
-    subprocess.run([
-        "osascript",
-        "-e",
-        'tell application "System Events" to keystroke "c" using command down'
-    ])
-    
+    # Simulate Cmd+C to copy selection, through the executor shared with the other controls
+    step = batch().keystroke("c", ("command",)).run()[0]
+    if not step.ok:
+        print(f"⚠️ Could not copy the selection: {step.value}")
+
     # Read from clipboard
     result = subprocess.run(["pbpaste"], stdout=subprocess.PIPE)
     return result.stdout.decode("utf-8")
 
+
+def _split_long(sentence, max_chars):
+    """Break a run-on sentence at commas, then spaces, so no piece exceeds max_chars"""
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(", ", 0, max_chars)
+        cut = cut + 1 if cut > 0 else sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def split_text(text, max_chars=None):
+    """
+    Split text into chunks of whole sentences, at most max_chars long, that
+    never span a paragraph break. The first chunk is a single sentence so
+    the first audio arrives as early as possible.
+    """
+    max_chars = max_chars or MAX_CHUNK_CHARS
+    chunks = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        current = ""
+        for sentence in _SENTENCE_END.split(paragraph):
+            for piece in _split_long(sentence.strip(), max_chars):
+                if current and (not chunks or len(current) + 1 + len(piece) > max_chars):
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class TextReader:
+    """
+    Reads a list of chunks aloud: chunk N plays while chunks N+1..N+prefetch
+    are synthesized. Runs as the speaker of one queued announcement, so a
+    barge-in stops it like any other announcement.
+    """
+
+    def __init__(self, announcer=None, prefetch=None, voice_id=None):
+        if announcer is None:
+            import tts_announcer
+            announcer = tts_announcer.get_announcer()
+        self.announcer = announcer
+        self.prefetch = max(1, PREFETCH if prefetch is None else prefetch)
+        self.voice_id = voice_id or VOICE_ID
+        self.stats = {"chunks": 0, "played": 0, "first_audio_ms": None, "stall_ms": 0.0}
+        self._paused = threading.Event()
+        self._stop = threading.Event()
+
+    def _synthesize(self, chunk):
+        return self.announcer._generate_speech(chunk, voice_id=self.voice_id, cacheable=False,
+                                               voice_settings=VOICE_SETTINGS)
+
+    def read(self, text, stop=None):
+        """Read text aloud; blocks until done. Returns True if every chunk was played."""
+        if stop is not None:
+            self._stop = stop
+        chunks = split_text(text)
+        self.stats["chunks"] = len(chunks)
+        if not chunks:
+            print("No text to read.")
+            return False
+
+        print(f"📖 Reading {len(chunks)} chunks ({len(text)} characters)")
+        started = time.perf_counter()
+        pending = deque()
+        upcoming = iter(chunks)
+        executor = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="read-ahead")
+        try:
+            for chunk in upcoming:
+                pending.append(executor.submit(self._synthesize, chunk))
+                if len(pending) > self.prefetch:
+                    break
+            while pending and not self._stop.is_set():
+                waited = time.perf_counter()
+                audio_data = pending.popleft().result()
+                # Top the window back up before playing, so synthesis overlaps playback
+                next_chunk = next(upcoming, None)
+                if next_chunk is not None:
+                    pending.append(executor.submit(self._synthesize, next_chunk))
+                if self.stats["first_audio_ms"] is None:
+                    self.stats["first_audio_ms"] = (time.perf_counter() - started) * 1000
+                else:
+                    self.stats["stall_ms"] += (time.perf_counter() - waited) * 1000
+                if not audio_data:
+                    print("⚠️ Skipping a chunk that could not be synthesized")
+                    continue
+                if self._play(audio_data):
+                    self.stats["played"] += 1
+        finally:
+            # Don't wait for chunks we will never play
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        print(f"📖 Read {self.stats['played']}/{len(chunks)} chunks; first audio after "
+              f"{self.stats['first_audio_ms'] or 0:.0f} ms, {self.stats['stall_ms']:.0f} ms waiting between chunks")
+        return self.stats["played"] == len(chunks) and not self._stop.is_set()
+
+    def _play(self, audio_data):
+        """Play one chunk from memory, honouring pause and stop; returns True if it finished"""
+        import pygame
+
+        try:
+            pygame.mixer.music.load(io.BytesIO(audio_data))
+            pygame.mixer.music.play()
+        except Exception as e:
+            print(f"✗ Audio playback error: {e}")
+            return False
+
+        paused = False
+        # get_busy() is False while paused, so track that ourselves
+        while paused or pygame.mixer.music.get_busy():
+            if self._stop.wait(0.02):
+                pygame.mixer.music.stop()
+                return False
+            if self._paused.is_set() != paused:
+                paused = not paused
+                if paused:
+                    pygame.mixer.music.pause()
+                else:
+                    pygame.mixer.music.unpause()
+        return True
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def stop(self):
+        self._stop.set()
+        self._paused.clear()
+
+
+def read_aloud(text):
+    """
+    Queue text to be read on the announcement worker; returns its future.
+    The reader is kept so pause_reading() / resume_reading() / stop_reading() can reach it.
+    """
+    global _current_reader, _current_reading
+    from tts_queue import PRIORITY_INFO, announce
+
+    _current_reader = TextReader()
+    _current_reading = announce(text, PRIORITY_INFO, speak=_current_reader.read)
+    return _current_reading
+
+
+def pause_reading():
+    if _current_reader:
+        _current_reader.pause()
+
+
+def resume_reading():
+    if _current_reader:
+        _current_reader.resume()
+
+
+def stop_reading():
+    if _current_reading:
+        # Sets the reader's stop event, or drops it if it hasn't started yet
+        _current_reading.cancel()
+
+
 def read_text_elevenlabs(text):
     """Convert text to speech using ElevenLabs API and play it."""
     if not text.strip():
         print("No text to read.")
         return
-    
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
-    headers = {
-        "xi-api-key": ELEVEN_KEY,
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "text": text,
-        "voice_settings": {
-            "stability": 0.7,
-            "similarity_boost": 0.75
-        }
-    }
-
-    response = requests.post(url, json=payload, headers=headers)
-    
-    if response.status_code == 200:
-        with open("output.wav", "wb") as f:
-            f.write(response.content)
-        # Play audio
-        subprocess.run(["afplay", "output.wav"])
-    else:
-        print("ElevenLabs TTS error:", response.status_code, response.text)
+    read_aloud(text).result()
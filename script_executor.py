@@ -0,0 +1,187 @@
+"""
+Batched AppleScript execution
+System controls used to spawn one osascript per key press or volume read.
+A ScriptBatch compiles a whole sequence of steps (key codes, delays, volume
+reads and writes) into one script, runs it in a single osascript process and
+returns a result per step. Every step is tagged with a `-- elda step:` comment
+so the fake osascript in benchmarks/fake_bin can simulate it off macOS.
+"""
+
+import subprocess
+import threading
+import time
+
+OSASCRIPT = "osascript"
+MODIFIERS = {"command", "option", "control", "shift"}
+
+
+class ScriptError(RuntimeError):
+    """osascript itself failed, so no step results are available"""
+
+
+class StepResult:
+    """What one step of a batch returned; value is the step's text result"""
+
+    __slots__ = ("step", "ok", "value")
+
+    def __init__(self, step, ok, value):
+        self.step = step
+        self.ok = ok
+        self.value = value
+
+    def __repr__(self):
+        return f"StepResult({self.step!r}, ok={self.ok}, value={self.value!r})"
+
+
+class ScriptBatch:
+    """A sequence of system-control steps run as one osascript invocation"""
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.steps = []  # (description, AppleScript lines that leave the result in elda_result)
+
+    def _add(self, description, lines):
+        self.steps.append((description, lines))
+        return self
+
+    @staticmethod
+    def _using(modifiers):
+        unknown = set(modifiers) - MODIFIERS
+        if unknown:
+            raise ValueError(f"Unknown modifiers: {sorted(unknown)}")
+        return f" using {{{', '.join(f'{m} down' for m in modifiers)}}}" if modifiers else ""
+
+    def key_code(self, code, modifiers=()):
+        """Press a key, e.g. key_code(24, ("command", "option"))"""
+        using = self._using(modifiers)
+        return self._add(f"key_code {code} {'+'.join(modifiers)}".strip(), [
+            f'tell application "System Events" to key code {int(code)}{using}',
+            'set elda_result to "ok"',
+        ])
+
+    def keystroke(self, text, modifiers=()):
+        """Type text, e.g. keystroke("c", ("command",)) to copy the selection"""
+        using = self._using(modifiers)
+        quoted = text.replace("\\", "\\\\").replace('"', '\\"')
+        return self._add(f"keystroke {len(text)} {'+'.join(modifiers)}".strip(), [
+            f'tell application "System Events" to keystroke "{quoted}"{using}',
+            'set elda_result to "ok"',
+        ])
+
+    def delay(self, seconds):
+        return self._add(f"delay {seconds:g}", [f"delay {seconds:g}", 'set elda_result to "ok"'])
+
+    def get_volume(self):
+        """Result: the output volume, 0-100"""
+        return self._add("get_volume", ["set elda_result to output volume of (get volume settings)"])
+
+    def set_volume(self, level):
+        """Result: the level that was set"""
+        level = max(0, min(100, int(level)))
+        return self._add(f"set_volume {level}", [
+            f"set volume output volume {level}",
+            f"set elda_result to {level}",
+        ])
+
+    def exchange_volume(self, level):
+        """Set the volume and report what it was. Result: "before->after" """
+        level = max(0, min(100, int(level)))
+        return self._add(f"exchange_volume {level}", [
+            "set elda_before to output volume of (get volume settings)",
+            f"set volume output volume {level}",
+            f'set elda_result to (elda_before as text) & "->{level}"',
+        ])
+
+    def adjust_volume(self, change):
+        """Read and write the volume in one step. Result: "before->after" """
+        return self._add(f"adjust_volume {int(change)}", [
+            "set elda_before to output volume of (get volume settings)",
+            f"set elda_after to elda_before + ({int(change)})",
+            "if elda_after > 100 then set elda_after to 100",
+            "if elda_after < 0 then set elda_after to 0",
+            "set volume output volume elda_after",
+            'set elda_result to (elda_before as text) & "->" & (elda_after as text)',
+        ])
+
+    def compile(self):
+        """The AppleScript source; each step is wrapped so one failure doesn't stop the rest"""
+        lines = ["set elda_results to {}"]
+        for description, body in self.steps:
+            lines.append(f"-- elda step: {description}")
+            lines.append("try")
+            lines += [f"    {line}" for line in body]
+            lines.append("    set end of elda_results to (elda_result as text)")
+            lines.append("on error elda_error")
+            lines.append('    set end of elda_results to "error: " & elda_error')
+            lines.append("end try")
+        lines.append("set AppleScript's text item delimiters to linefeed")
+        lines.append("return elda_results as text")
+        return "\n".join(lines)
+
+    def run(self, timeout=10):
+        """Run every step in one osascript process; returns a StepResult per step"""
+        return (self.executor or get_executor()).run(self, timeout=timeout)
+
+
+class ScriptExecutor:
+    """
+    Runs batches one at a time, so key presses from commands handled
+    concurrently never interleave, and counts spawns and time spent.
+    """
+
+    def __init__(self, osascript=OSASCRIPT):
+        self.osascript = osascript
+        self.stats = {"invocations": 0, "steps": 0, "failures": 0, "total_ms": 0.0}
+        self._lock = threading.Lock()
+
+    def batch(self):
+        return ScriptBatch(self)
+
+    def run(self, batch, timeout=10):
+        if not batch.steps:
+            return []
+        source = batch.compile()
+        with self._lock:
+            started = time.perf_counter()
+            try:
+                result = subprocess.run([self.osascript, "-"], input=source,
+                                        capture_output=True, text=True, timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                self.stats["failures"] += 1
+                raise ScriptError(f"osascript failed to run: {e}") from e
+            finally:
+                self.stats["invocations"] += 1
+                self.stats["steps"] += len(batch.steps)
+                self.stats["total_ms"] += (time.perf_counter() - started) * 1000
+
+        if result.returncode != 0:
+            self.stats["failures"] += 1
+            raise ScriptError(result.stderr.strip() or f"osascript exited with {result.returncode}")
+
+        values = result.stdout.rstrip("\n").split("\n") if result.stdout.strip() else []
+        results = []
+        for index, (description, _) in enumerate(batch.steps):
+            value = values[index] if index < len(values) else "error: no result"
+            if value.startswith("error: "):
+                results.append(StepResult(description, False, value[len("error: "):]))
+            else:
+                results.append(StepResult(description, True, value))
+        return results
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The process-wide executor shared by volume, brightness and zoom"""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ScriptExecutor()
+        return _shared_executor
+
+
+def batch():
+    """A new batch on the shared executor"""
+    return get_executor().batch()
@@ -0,0 +1,54 @@
+"""
+In-memory audio containers
+Hands captured int16 buffers to the STT client without touching the disk
+"""
+
+import io
+import os
+import time
+import wave
+
+import numpy as np
+
+
+def encode_wav(audio, fs=16000, name="command.wav"):
+    """Encode an int16 mono buffer as an in-memory WAV file object"""
+    samples = np.ascontiguousarray(audio, dtype=np.int16).reshape(-1)
+
+    wav_file = io.BytesIO()
+    with wave.open(wav_file, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(fs)
+        wf.writeframes(samples.tobytes())
+    wav_file.seek(0)
+
+    # The OpenAI SDK infers the container format from the file name
+    wav_file.name = name
+    return wav_file
+
+
+def decode_wav(wav_file):
+    """Decode a WAV path or file object into (int16 mono buffer, sample rate)"""
+    with wave.open(wav_file, "rb") as wf:
+        fs = wf.getframerate()
+        channels = wf.getnchannels()
+        if wf.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV files are supported")
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels)[:, 0].copy()
+    return samples, fs
+
+
+def dump_debug_audio(wav_file, directory=None):
+    """Write an encoded WAV file object to disk for debugging; returns the path"""
+    directory = directory or os.getenv("ELDA_DEBUG_AUDIO_DIR", "debug_audio")
+    os.makedirs(directory, exist_ok=True)
+
+    # Unique name per utterance so overlapping pipelines never clobber each other
+    path = os.path.join(directory, f"command-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}.wav")
+    with open(path, "wb") as f:
+        f.write(wav_file.getbuffer())
+    print(f"🐞 Dumped debug audio to {path}")
+    return path
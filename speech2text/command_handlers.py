@@ -0,0 +1,234 @@
+"""
+Command dispatch
+Maps each intent to a handler built once at startup. A transcript is parsed
+once into typed commands; independent commands run concurrently, every call
+is timed, and the results are confirmed in a single announcement.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from zoom_controller.zoom_controller import MAX_ZOOM, ZOOM_STEP, ZoomController
+from brightness import get_controller as brightness_controller, increase_brightness, decrease_brightness, set_brightness
+from volume import get_current_volume, set_volume, adjust_volume
+from speech2text.command_parser import parse_commands
+
+DEFAULT_VOLUME_STEP = 50
+DEFAULT_ZOOM_STEPS = 3
+MAX_ZOOM_STEPS = 10
+RESET_WORDS = {"reset", "normal", "default"}
+
+
+class CommandRejected(Exception):
+    """A command that can't be carried out as asked; the message is said to the user"""
+
+
+# What to say went wrong when a handler raises
+ERROR_ACTIVITIES = {
+    "zoom_in": "zooming in",
+    "zoom_out": "zooming out",
+    "adjust_volume": "adjusting volume",
+    "adjust_brightness": "adjusting brightness",
+    "how_to_do_something": "showing the guide",
+    "read_text": "reading the highlighted text",
+}
+
+# Confirmations handlers return most often; prewarmed into the TTS cache
+COMMON_CONFIRMATIONS = (
+    "zoomed in",
+    "zoomed out",
+    f"increased your volume by {DEFAULT_VOLUME_STEP} percent",
+    f"decreased your volume by {DEFAULT_VOLUME_STEP} percent",
+    "muted your volume",
+    "increased your screen brightness",
+    "decreased your screen brightness",
+)
+
+
+def _tts():
+    """tts_announcer pulls in pygame, so it is imported on first use (or by warm_up)"""
+    import tts_announcer
+    return tts_announcer
+
+
+def _zoom_level(level):
+    """A magnification the controller can reach, rounded to what its steps land on"""
+    if not 1.0 <= level <= MAX_ZOOM:
+        raise CommandRejected(f"zoom only goes from 1 to {MAX_ZOOM:g} times, not {level:g}")
+    return 1.0 + round((level - 1.0) / ZOOM_STEP) * ZOOM_STEP
+
+
+class CommandRequest:
+    """A transcript and its intent, parsed once into typed commands before dispatch"""
+
+    __slots__ = ("text", "intent", "commands")
+
+    def __init__(self, text, intent):
+        self.text = text
+        self.intent = (intent or "other").strip().lower()
+        self.commands = parse_commands(text, self.intent)
+
+
+class CommandRegistry:
+    """Intent -> handler table with per-handler timing"""
+
+    def __init__(self, max_workers=3):
+        # One controller for the whole session instead of one per zoom command
+        self.zoom_controller = ZoomController()
+        self.handlers = {
+            "introduce_myself": self.introduce_myself,
+            "zoom_in": self.zoom_in,
+            "zoom_out": self.zoom_out,
+            "read_text": self.read_text,
+            "adjust_volume": self.adjust_volume,
+            "adjust_brightness": self.adjust_brightness,
+            "how_to_do_something": self.how_to,
+        }
+        self.timings = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="command")
+
+    def register(self, intent, handler):
+        """Add or replace the handler for an intent"""
+        self.handlers[intent] = handler
+
+    def dispatch(self, request):
+        """
+        Run every command in the request and confirm them in one announcement.
+        Commands on different controls run concurrently; commands on the same
+        control keep their spoken order.
+        """
+        groups = {}
+        for command in request.commands:
+            if command.intent not in self.handlers:
+                print(f"🤷 No handler for intent '{command.intent}'")
+                continue
+            groups.setdefault(command.target, []).append(command)
+        if not groups:
+            if not request.commands:
+                print(f"🤷 No handler for intent '{request.intent}'")
+            return
+
+        if len(groups) == 1:
+            outcomes = self._run_group(next(iter(groups.values())))
+        else:
+            futures = [self._executor.submit(self._run_group, group) for group in groups.values()]
+            outcomes = [outcome for future in futures for outcome in future.result()]
+
+        done = [result for ok, result in outcomes if ok and result]
+        failed = [result for ok, result in outcomes if not ok]
+        if done:
+            _tts().announce_actions(done)
+        if failed:
+            _tts().announce_error(" and ".join(failed))
+        return outcomes
+
+    def _run_group(self, commands):
+        return [self._run(command) for command in commands]
+
+    def _run(self, command):
+        """(True, confirmation or None) on success, (False, activity) on failure"""
+        started = time.perf_counter()
+        try:
+            return True, self.handlers[command.intent](command)
+        except CommandRejected as e:
+            print(f"🚫 {command.intent}: {e}")
+            return False, str(e)
+        except Exception as e:
+            print(f"Error with {command.intent}: {e}")
+            return False, ERROR_ACTIVITIES.get(command.intent, "handling that command")
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self.timings.setdefault(command.intent, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+            stats["calls"] += 1
+            stats["total_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+            print(f"⏱️ {command.intent} handled in {elapsed * 1000:.0f} ms")
+
+    # ---------------- Handlers ---------------- #
+    # Each handler performs one Command and returns what to confirm
+    # ("increased your volume"), or None if it has nothing to add.
+    def introduce_myself(self, command):
+        print("👋 Introduce myself command detected!")
+        _tts().introduce_myself()
+
+    def zoom_in(self, command):
+        print("🔍 Zoom in command detected!")
+        return self._zoom(command, self.zoom_controller.zoom_in, "zoomed in")
+
+    def zoom_out(self, command):
+        print("🔍 Zoom out command detected!")
+        return self._zoom(command, self.zoom_controller.zoom_out, "zoomed out")
+
+    def _zoom(self, command, step, confirmation):
+        """
+        Reset, go to an absolute level ("zoom to 2x", "zoom to 200 percent"),
+        change by a percentage ("zoom in by 50 percent") or step in/out
+        """
+        zoom = self.zoom_controller
+        # "200" can only mean 200%, as no magnification goes that high
+        percent = command.amount is not None and (command.percent or command.amount > MAX_ZOOM)
+        if RESET_WORDS & set(command.text.lower().split()):
+            ok, confirmation = zoom.reset_zoom(), "reset the zoom"
+        elif command.absolute and command.amount:
+            level = _zoom_level(command.amount / 100 if percent else command.amount)
+            ok, confirmation = zoom.zoom_to(level), f"set the zoom to {level:g} times"
+        elif percent:
+            # Unknown magnification: zoom_to resets first, so the change is from 1x
+            change = command.amount / 100 if command.direction != "down" else -command.amount / 100
+            level = _zoom_level((zoom.current_zoom or 1.0) * (1 + change))
+            ok, confirmation = zoom.zoom_to(level), f"set the zoom to {level:g} times"
+        else:
+            steps = DEFAULT_ZOOM_STEPS if command.amount is None else min(command.amount, MAX_ZOOM_STEPS)
+            ok = step(max(1, round(steps)))
+        if not ok:
+            raise RuntimeError("the zoom shortcut failed")
+        return confirmation
+
+    def read_text(self, command):
+        print("📖 Read text command detected!")
+        from read_highlight import get_clipboard_text, read_aloud
+        text = get_clipboard_text()
+        if not text.strip():
+            raise ValueError("nothing is highlighted")
+        # Queued behind the confirmations; a wake word stops it like any announcement
+        read_aloud(text)
+
+    def adjust_volume(self, command):
+        print("🔊 Volume command detected!")
+        if command.absolute:
+            set_volume(command.amount)
+            return "muted your volume" if command.amount == 0 else f"set your volume to {command.amount} percent"
+        if command.direction is None:
+            current = get_current_volume()
+            print(f"Current volume: {current}%")
+            return f"checked your volume, it's at {current} percent"
+
+        amount = command.amount if command.amount is not None else DEFAULT_VOLUME_STEP
+        adjust_volume(amount if command.direction == "up" else -amount)
+        verb = "increased" if command.direction == "up" else "decreased"
+        return f"{verb} your volume by {amount} percent"
+
+    def adjust_brightness(self, command):
+        print("💡 Brightness command detected!")
+        if command.absolute:
+            set_brightness(command.amount)
+            # Key presses from an unknown level can only land near the target
+            about = "about " if brightness_controller().estimated else ""
+            return f"set your screen brightness to {about}{command.amount} percent"
+        step = {} if command.amount is None else {"amount": command.amount / 100}
+        # Default to increase if the direction is unclear
+        if command.direction == "down":
+            decrease_brightness(**step)
+            return "decreased your screen brightness"
+        increase_brightness(**step)
+        return "increased your screen brightness"
+
+    def how_to(self, command):
+        print("📚 How-to command detected!")
+        # Trigger Electron window via WebSocket
+        from websocket_client import trigger_electron_howto
+        trigger_electron_howto(command.text)
+
+        # The Electron frontend will fetch from Flask when it loads
+        print("✅ Electron window triggered!")
+        _tts().announce_how_to_triggered()
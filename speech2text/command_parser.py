@@ -0,0 +1,223 @@
+"""
+Structured command parsing
+Turns a transcript into typed commands (intent, direction, amount, absolute
+or relative) in a single pass over its words, so handlers never re-scan the
+text. "Make it louder and zoom in" becomes two commands.
+"""
+
+import re
+
+from speech2text.intent_cache import NUMBER_WORDS
+
+# Intents whose transcripts may hold several system-control commands
+CONTROL_INTENTS = {
+    "adjust_volume", "increase_volume", "volume_up_50", "volume_down_50",
+    "adjust_brightness", "zoom_in", "zoom_out",
+}
+
+# Intent -> (target, implied direction) for intents that already carry slots
+INTENT_TARGETS = {
+    "adjust_volume": ("volume", None),
+    "increase_volume": ("volume", "up"),
+    "volume_up_50": ("volume", "up"),
+    "volume_down_50": ("volume", "down"),
+    "adjust_brightness": ("brightness", None),
+    "zoom_in": ("zoom", "up"),
+    "zoom_out": ("zoom", "down"),
+}
+
+TARGET_WORDS = {
+    "volume": "volume", "sound": "volume", "louder": "volume", "quieter": "volume",
+    "softer": "volume", "mute": "volume", "audio": "volume",
+    "brightness": "brightness", "bright": "brightness", "brighter": "brightness",
+    "dim": "brightness", "dimmer": "brightness", "darker": "brightness",
+    "zoom": "zoom", "magnify": "zoom", "magnification": "zoom",
+}
+UP_WORDS = {"increase", "raise", "up", "louder", "higher", "brighter", "more", "in", "bigger"}
+DOWN_WORDS = {"decrease", "lower", "down", "quieter", "softer", "dimmer", "darker", "dim", "less", "out", "smaller"}
+# Words that pin the level instead of moving it
+ABSOLUTE_WORDS = {"mute": 0, "max": 100, "maximum": 100, "full": 100}
+CONJUNCTIONS = {"and", "then", "also", ","}
+PERCENT_WORDS = {"percent", "%"}
+
+TOKEN = re.compile(r"\d+(?:\.\d+)?|[a-z']+|[,%]")
+
+
+class Command:
+    """One action to perform: which handler, and the slots it needs"""
+
+    __slots__ = ("intent", "target", "text", "direction", "amount", "absolute", "percent")
+
+    def __init__(self, intent, text, target=None, direction=None, amount=None, absolute=False, percent=False):
+        self.intent = intent
+        self.target = target or intent  # the control it acts on; same-target commands run in order
+        self.text = text
+        self.direction = direction  # "up", "down" or None
+        self.amount = amount        # int, float ("1.5x") or None (handler default)
+        self.absolute = absolute    # amount is a level rather than a change
+        self.percent = percent      # amount was said as a percentage
+
+    def __repr__(self):
+        return (f"Command({self.intent!r}, direction={self.direction!r}, "
+                f"amount={self.amount!r}, absolute={self.absolute})")
+
+
+class _Clause:
+    __slots__ = ("target", "direction", "amount", "absolute", "percent", "words", "after_to", "set_seen")
+
+    def __init__(self):
+        self.target = None
+        self.direction = None
+        self.amount = None
+        self.absolute = False
+        self.percent = False
+        self.words = []
+        self.after_to = False
+        self.set_seen = False
+
+    def has_slots(self):
+        return self.target or self.direction or self.amount is not None or self.absolute
+
+
+def _scan(lowered):
+    """Split the transcript into clauses and fill their slots in one pass"""
+    clauses = [_Clause()]
+    for token in TOKEN.findall(lowered):
+        clause = clauses[-1]
+        if token in CONJUNCTIONS:
+            if clause.has_slots():
+                clauses.append(_Clause())
+            continue
+
+        clause.words.append(token)
+        if token[0].isdigit():
+            value = float(token) if "." in token else int(token)
+        else:
+            value = NUMBER_WORDS.get(token)
+        if value is not None:
+            if clause.amount is None:
+                clause.amount = value  # "a hundred" lands here as 100
+                clause.absolute = clause.absolute or clause.after_to or clause.set_seen
+            elif token == "hundred" and 0 < clause.amount < 10:
+                clause.amount *= 100  # "one hundred"
+            elif value < 10 and clause.amount >= 20 and clause.amount % 10 == 0:
+                clause.amount += value  # "twenty five"
+            continue
+
+        clause.after_to = token == "to"
+        if token in PERCENT_WORDS:
+            clause.percent = clause.amount is not None
+        if token == "set":
+            clause.set_seen = True
+        if clause.target is None and token in TARGET_WORDS:
+            clause.target = TARGET_WORDS[token]
+        if token in ABSOLUTE_WORDS and clause.amount is None:
+            clause.amount, clause.absolute = ABSOLUTE_WORDS[token], True
+        if clause.direction is None:
+            if token in UP_WORDS:
+                clause.direction = "up"
+            elif token in DOWN_WORDS:
+                clause.direction = "down"
+
+    merged = []
+    for clause in clauses:
+        if not clause.has_slots():
+            continue
+        only_target = clause.target and clause.direction is None and clause.amount is None and not clause.absolute
+        if only_target and merged and merged[-1].target is None:
+            # "turn it up, the volume": a bare control names what the clause before meant
+            merged[-1].target = clause.target
+            merged[-1].words += clause.words
+            continue
+        merged.append(clause)
+    return merged
+
+
+def _intent_for(target, direction):
+    if target == "volume":
+        return "adjust_volume"
+    if target == "brightness":
+        return "adjust_brightness"
+    return "zoom_out" if direction == "down" else "zoom_in"
+
+
+def _resolve(text, intent):
+    """
+    The transcript's clauses and the control each one acts on. A clause that
+    names no control continues the last one that did; before any has, it takes
+    the detected intent's control, unless another clause names that control
+    itself. The intent then came from that clause, so the target is None.
+    """
+    default_target, _ = INTENT_TARGETS.get(intent, (None, None))
+    clauses = _scan(text.lower())
+    named = {clause.target for clause in clauses if clause.target}
+    fallback = default_target if default_target not in named else None
+    targets = []
+    previous = None
+    for clause in clauses:
+        previous = clause.target or previous
+        targets.append(previous or fallback)
+    return clauses, targets
+
+
+def _command(clause, target, direction):
+    return Command(
+        _intent_for(target, direction), " ".join(clause.words), target=target,
+        direction=direction, amount=clause.amount, absolute=clause.absolute, percent=clause.percent,
+    )
+
+
+def _stray_controls(text):
+    """
+    Control commands in a transcript classified as "other", e.g. by the
+    keyword fallback when Gemini was unavailable: only clauses that name a
+    control and say which way or to what level, so "I'm on a zoom call"
+    stays a conversation.
+    """
+    return [
+        _command(clause, clause.target, clause.direction)
+        for clause in _scan(text.lower())
+        if clause.target and (clause.direction or clause.amount is not None)
+    ]
+
+
+def is_ambiguous(text, intent):
+    """
+    True if some clause of a control command can't be tied to a control, as in
+    "turn it up and zoom in" matched as zoom_in. Such transcripts should be
+    classified by Gemini rather than dispatched on the keyword match.
+    """
+    intent = (intent or "other").strip().lower()
+    if intent not in CONTROL_INTENTS:
+        return False
+    return None in _resolve(text, intent)[1]
+
+
+def parse_commands(text, intent):
+    """
+    Typed commands for a transcript and its detected intent. Anything that
+    isn't a system control (how-to, reading, introductions) stays a single
+    command carrying the whole transcript, as does "other" unless it holds
+    a clear control command.
+    """
+    intent = (intent or "other").strip().lower()
+    if intent not in CONTROL_INTENTS:
+        commands = _stray_controls(text) if intent == "other" else []
+        return commands or [Command(intent, text)]
+
+    default_target, default_direction = INTENT_TARGETS[intent]
+    clauses, targets = _resolve(text, intent)
+    if not clauses:
+        return [Command(_intent_for(default_target, default_direction), text,
+                        target=default_target, direction=default_direction)]
+
+    commands = []
+    for position, (clause, target) in enumerate(zip(clauses, targets)):
+        if target is None:
+            print(f"🤷 Not sure what \"{' '.join(clause.words)}\" should change, skipping it")
+            continue
+        direction = clause.direction
+        if direction is None and target == default_target and (position == 0 or not clause.target):
+            direction = default_direction
+        commands.append(_command(clause, target, direction))
+    return commands
@@ -0,0 +1,84 @@
+"""
+Energy-based voice activity endpointer
+Decides when a spoken command starts and ends so capture can stop as soon as the user finishes
+"""
+
+import numpy as np
+
+
+class EnergyEndpointer:
+    """Frame-by-frame energy VAD with pre-speech timeout, trailing-silence hang time and max length"""
+
+    def __init__(self, fs=16000, frame_ms=30, pre_speech_timeout=4.0, hang_time=0.8,
+                 max_length=10.0, min_speech_ms=90, threshold_ratio=3.0, min_threshold=300.0):
+        self.fs = fs
+        self.frame_ms = frame_ms
+        self.pre_speech_timeout = pre_speech_timeout
+        self.hang_time = hang_time
+        self.max_length = max_length
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+
+        # Number of consecutive loud frames needed before we call it speech (ignores clicks)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.reset()
+
+    def reset(self):
+        """Reset state so the endpointer can be reused for the next command"""
+        self.elapsed = 0.0
+        self.noise_floor = None
+        self.speech_started = False
+        self.speech_start = None
+        self.last_voice = None
+        self.voiced_run = 0
+        self.reason = None
+
+    @property
+    def threshold(self):
+        """Current RMS level above which a frame counts as voiced"""
+        if self.noise_floor is None:
+            return self.min_threshold
+        return max(self.min_threshold, self.noise_floor * self.threshold_ratio)
+
+    @property
+    def trailing_silence(self):
+        """Seconds of audio since the last voiced frame (the hang time, once speech has ended)"""
+        if self.last_voice is None:
+            return 0.0
+        return self.elapsed - self.last_voice
+
+    def process(self, frame):
+        """
+        Feed one int16 frame. Returns True once capture should stop;
+        the reason is then one of "end_of_speech", "no_speech" or "max_length".
+        """
+        if self.reason:
+            return True
+
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float64)))) if len(frame) else 0.0
+        frame_start = self.elapsed
+        self.elapsed += len(frame) / self.fs
+
+        voiced = rms > self.threshold
+        if voiced:
+            self.voiced_run += 1
+            self.last_voice = self.elapsed
+            if not self.speech_started and self.voiced_run >= self.min_speech_frames:
+                self.speech_started = True
+                self.speech_start = max(0.0, frame_start - (self.voiced_run - 1) * self.frame_ms / 1000)
+        else:
+            self.voiced_run = 0
+            # Track the background level slowly so a noisy room raises the threshold
+            if self.noise_floor is None:
+                self.noise_floor = rms
+            elif not self.speech_started:
+                self.noise_floor = 0.9 * self.noise_floor + 0.1 * rms
+
+        if self.elapsed >= self.max_length:
+            self.reason = "max_length"
+        elif not self.speech_started and self.elapsed >= self.pre_speech_timeout:
+            self.reason = "no_speech"
+        elif self.speech_started and self.elapsed - self.last_voice >= self.hang_time:
+            self.reason = "end_of_speech"
+
+        return self.reason is not None
@@ -0,0 +1,179 @@
+"""
+Persistent intent cache
+Remembers the intent Gemini gave for a normalized transcript so repeated
+commands ("make it louder", "zoom in please") skip the round trip.
+In-memory LRU in front of a small SQLite store that survives restarts.
+Hits only touch memory; their "last used" times are written in batches.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+FILLER_WORDS = {
+    "um", "umm", "uh", "uhh", "er", "erm", "hmm", "like", "just", "so", "okay", "ok",
+    "please", "hey", "elda", "well", "actually", "maybe", "kindly", "the",
+}
+FILLER_PHRASES = ["can you", "could you", "would you", "will you", "i want you to", "i'd like you to", "thank you"]
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60,
+    "seventy": 70, "eighty": 80, "ninety": 90, "hundred": 100,
+}
+
+
+def _canonicalize_numbers(words):
+    """Turn spelled-out numbers into digits ("twenty five" -> "25")"""
+    out = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word in NUMBER_WORDS:
+            value = NUMBER_WORDS[word]
+            if 0 < value < 10 and i + 1 < len(words) and words[i + 1] == "hundred":
+                value *= 100  # "one hundred"
+                i += 1
+            elif value >= 20 and value % 10 == 0 and value < 100 and i + 1 < len(words) \
+                    and NUMBER_WORDS.get(words[i + 1], 10) < 10:
+                value += NUMBER_WORDS[words[i + 1]]
+                i += 1
+            out.append(str(value))
+        else:
+            out.append(word)
+        i += 1
+    return out
+
+
+def normalize_transcript(text):
+    """Case, punctuation, filler words and numbers folded so equivalent commands share a key"""
+    text = (text or "").lower().replace("%", " percent ").replace("-", " ")
+    text = re.sub(r"[^\w\s']", " ", text)
+    text = f" {' '.join(text.split())} "
+    for phrase in FILLER_PHRASES:
+        text = text.replace(f" {phrase} ", " ")
+    words = [w for w in text.split() if w not in FILLER_WORDS]
+    return " ".join(_canonicalize_numbers(words))
+
+
+def fingerprint(*parts):
+    """Stable hash of whatever the cached answers depend on (e.g. the prompt and intent list)"""
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+class IntentCache:
+    """LRU of normalized transcript -> intent, persisted to SQLite with TTL and size bound"""
+
+    def __init__(self, path=None, fingerprint="", ttl_seconds=7 * 24 * 3600, max_entries=500):
+        self.path = path or os.path.join(os.path.expanduser("~"), ".cache", "elda", "intent_cache.sqlite")
+        self.fingerprint = fingerprint
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidated": 0}
+
+        self._memory = OrderedDict()
+        self._touched = {}  # key -> last hit time, not yet written to SQLite
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS intents ("
+                "key TEXT PRIMARY KEY, intent TEXT, fingerprint TEXT, created REAL, used REAL)"
+            )
+            self._load()
+        except sqlite3.Error as e:
+            print(f"⚠️ Intent cache on disk unavailable ({e}), using memory only")
+            self._db = None
+
+    def _load(self):
+        """Drop entries from an older intent list or past their TTL, then warm the LRU"""
+        now = time.time()
+        with self._db:
+            cursor = self._db.execute("DELETE FROM intents WHERE fingerprint != ?", (self.fingerprint,))
+            self.stats["invalidated"] += cursor.rowcount
+            self._db.execute("DELETE FROM intents WHERE created < ?", (now - self.ttl_seconds,))
+        rows = self._db.execute(
+            "SELECT key, intent, created FROM intents ORDER BY used DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for key, intent, created in reversed(rows):
+            self._memory[key] = (intent, created)
+
+    def get(self, transcript):
+        """Cached intent for a transcript, or None"""
+        key = normalize_transcript(transcript)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] > self.ttl_seconds:
+                del self._memory[key]
+                self.stats["expired"] += 1
+                entry = None
+            if not entry:
+                self.stats["misses"] += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            if self._db:
+                # Only orders the warm-up on the next start, so it waits for the next write
+                self._touched[key] = now
+            return entry[0]
+
+    def put(self, transcript, intent):
+        key = normalize_transcript(transcript)
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            self._memory[key] = (intent, now)
+            self._memory.move_to_end(key)
+            evicted = []
+            while len(self._memory) > self.max_entries:
+                evicted.append(self._memory.popitem(last=False)[0])
+            self.stats["evictions"] += len(evicted)
+
+            if self._db:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO intents VALUES (?, ?, ?, ?, ?)",
+                        (key, intent, self.fingerprint, now, now),
+                    )
+                    self._db.executemany("DELETE FROM intents WHERE key = ?", [(k,) for k in evicted])
+                    self._write_touched()
+
+    def _write_touched(self):
+        """Record the batched hit times (lock held, inside a transaction)"""
+        if self._touched:
+            self._db.executemany("UPDATE intents SET used = ? WHERE key = ?",
+                                 [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def flush(self):
+        """Write pending hit times to SQLite (on put, and at exit)"""
+        with self._lock:
+            if self._db and self._touched:
+                try:
+                    with self._db:
+                        self._write_touched()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not save intent cache usage: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._db:
+                with self._db:
+                    self._db.execute("DELETE FROM intents")
+
+    def __len__(self):
+        return len(self._memory)
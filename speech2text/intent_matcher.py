@@ -0,0 +1,123 @@
+"""
+Compiled keyword intent matcher
+All keyword rules are compiled into a single regex trie, so a transcript is
+scanned once and every matched phrase comes back with a confidence score
+"""
+
+import re
+from collections import namedtuple
+
+# Intent -> {phrase: weight}, in priority order (earlier intents win ties).
+# Weights say how sure a phrase alone makes us; vague single words stay low
+# so they escalate to Gemini instead of being dispatched blindly.
+INTENT_RULES = [
+    ("introduce_myself", {
+        "who are you": 0.95, "tell me about yourself": 0.95, "introduce yourself": 0.95,
+        "what are you": 0.85, "introduce": 0.8, "yourself": 0.5,
+    }),
+    ("zoom_in", {
+        "zoom in": 0.95, "zoom closer": 0.95, "zoom to": 0.9, "closer": 0.5, "bigger": 0.6,
+    }),
+    ("zoom_out", {
+        "zoom out": 0.95, "zoom away": 0.95, "reset zoom": 0.95, "reset the zoom": 0.95,
+        "smaller": 0.6, "farther": 0.5,
+    }),
+    ("volume_up_50", {
+        "volume up 50": 0.95, "increase volume 50": 0.95, "volume up by 50": 0.95,
+    }),
+    ("volume_down_50", {
+        "volume down 50": 0.95, "decrease volume 50": 0.95, "volume down by 50": 0.95,
+    }),
+    ("increase_volume", {
+        "increase volume": 0.95, "increase the volume": 0.95, "volume up": 0.95,
+        "louder": 0.9, "turn up the volume": 0.95, "turn up": 0.7,
+    }),
+    ("adjust_volume", {
+        "decrease volume": 0.95, "decrease the volume": 0.95, "volume down": 0.95,
+        "lower volume": 0.95, "lower the volume": 0.95, "quieter": 0.9,
+        "turn down the volume": 0.95, "turn down": 0.7, "mute": 0.9,
+        "set volume": 0.95, "set the volume": 0.95, "volume to": 0.9,
+        "what is the volume": 0.95, "what's the volume": 0.95, "current volume": 0.95,
+    }),
+    ("adjust_brightness", {
+        "increase brightness": 0.95, "brightness up": 0.95, "brighter": 0.9,
+        "decrease brightness": 0.95, "brightness down": 0.95, "dimmer": 0.9, "darker": 0.9,
+        "dim the screen": 0.95, "dim": 0.7, "set brightness": 0.95, "set the brightness": 0.95,
+        "brightness to": 0.9,
+    }),
+    ("how_to_do_something", {
+        "how do i": 0.9, "how to": 0.85, "show me how": 0.95, "teach me": 0.9, "help me": 0.6,
+    }),
+    ("read_text", {
+        "read clipboard": 0.95, "read text": 0.95, "read this": 0.9, "what does this say": 0.95, "read": 0.5,
+    }),
+]
+
+# How much a match is trusted when it sits inside a longer word ("read" in "already")
+PARTIAL_WORD_PENALTY = 0.5
+# How much the best match is trusted when the transcript also matches other intents
+CONFLICT_PENALTY = 0.5
+
+IntentMatch = namedtuple("IntentMatch", ["intent", "confidence", "phrases"])
+
+
+def _trie_pattern(phrases):
+    """Build a regex alternation shaped like a trie, preferring the longest phrase"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class IntentMatcher:
+    """Multi-pattern keyword matcher built once from INTENT_RULES"""
+
+    def __init__(self, rules=INTENT_RULES):
+        self.priority = {}
+        self.phrases = {}
+        for rank, (intent, phrases) in enumerate(rules):
+            self.priority[intent] = rank
+            for phrase, weight in phrases.items():
+                # A phrase listed twice belongs to the higher-priority intent
+                self.phrases.setdefault(phrase, (intent, weight))
+
+        self.pattern = re.compile(_trie_pattern(self.phrases))
+
+    def match(self, text):
+        """Return IntentMatch(intent, confidence 0-1, matched phrases) for a transcript"""
+        text = (text or "").lower()
+        scores = {}
+        phrases = []
+        for m in self.pattern.finditer(text):
+            phrase = m.group(0)
+            intent, weight = self.phrases[phrase]
+            start, end = m.span()
+            whole_word = (start == 0 or not text[start - 1].isalnum()) and \
+                (end == len(text) or not text[end].isalnum())
+            if not whole_word:
+                weight *= PARTIAL_WORD_PENALTY
+            scores[intent] = max(scores.get(intent, 0.0), weight)
+            phrases.append(phrase)
+
+        if not scores:
+            return IntentMatch("other", 0.0, [])
+
+        intent = min(scores, key=self.priority.__getitem__)
+        confidence = scores[intent]
+        if len(scores) > 1:
+            confidence *= CONFLICT_PENALTY
+        return IntentMatch(intent, confidence, phrases)
+
+
+default_matcher = IntentMatcher()
@@ -0,0 +1,177 @@
+"""
+Persistent microphone stream
+One long-lived input stream feeds a ring buffer that wake-word detection and
+command capture both read from, so the device is never reopened between them
+"""
+
+import time
+
+import numpy as np
+import sounddevice as sd
+
+
+class AudioRingBuffer:
+    """Single-producer ring buffer of int16 samples; each reader keeps its own position"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        # Total samples ever written. Only the producer advances it, and only after
+        # the samples are in place, so readers never need a lock.
+        self.written = 0
+        # Where the write in progress will end. Advanced before any slot is
+        # overwritten, so a reader can tell its copy may have been torn.
+        self.reserved = 0
+
+    def write(self, samples):
+        """Append samples (called from the audio callback)"""
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        self.reserved = self.written + n
+        start = (self.reserved - len(samples)) % self.capacity
+        n = len(samples)
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        if first < n:
+            self._buffer[:n - first] = samples[first:]
+        self.written = self.reserved
+
+    def oldest(self):
+        """Oldest absolute position that is still held in the buffer"""
+        return max(0, self.written - self.capacity)
+
+    def copy(self, position, out):
+        """
+        Copy len(out) samples starting at absolute position into out.
+        Returns False if the producer overwrote them before we finished.
+        """
+        n = len(out)
+        if position < max(0, self.reserved - self.capacity):
+            return False
+
+        start = position % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self._buffer[start:start + first]
+        if first < n:
+            out[first:] = self._buffer[:n - first]
+
+        # Checked against `reserved`, not `written`: a write that started while
+        # we copied may already have overwritten the oldest slots
+        return position >= max(0, self.reserved - self.capacity)
+
+
+class MicReader:
+    """A consumer cursor into the shared ring buffer"""
+
+    def __init__(self, ring, position, poll_interval=0.005):
+        self.ring = ring
+        self.position = position
+        self.poll_interval = poll_interval
+        self.dropped = 0
+
+    def available(self):
+        """Samples that can be read right now without waiting"""
+        return self.ring.written - self.position
+
+    def seek_to_latest(self):
+        """Skip everything buffered so far and continue from live audio"""
+        self.position = self.ring.written
+
+    def read_into(self, out, timeout=None):
+        """
+        Block until len(out) samples are available and copy them into out
+        without allocating. Returns False if the timeout expires first.
+        """
+        n = len(out)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.available() < n:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+        while not self.ring.copy(self.position, out):
+            # We fell a whole buffer behind; skip ahead to the oldest audio still held
+            oldest = self.ring.oldest()
+            self.dropped += oldest - self.position
+            self.position = oldest
+        self.position += n
+        return True
+
+    def read(self, n, timeout=None):
+        """
+        Block until n samples are available and return them as an int16 array.
+        Returns None if the timeout expires first.
+        """
+        out = np.empty(n, dtype=np.int16)
+        return out if self.read_into(out, timeout) else None
+
+
+class MicrophoneStream:
+    """Long-lived 16-bit mono input stream backed by an AudioRingBuffer"""
+
+    def __init__(self, samplerate=16000, blocksize=512, buffer_seconds=10.0, device=None):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.device = device
+        self.ring = AudioRingBuffer(int(buffer_seconds * samplerate))
+        self._stream = None
+
+        # Updated from the audio callback; read them via stats()
+        self.callbacks = 0
+        self.input_overflows = 0
+        self.input_underflows = 0
+
+    def _callback(self, indata, frames, time_info, status):
+        # Runs on the PortAudio thread: no printing, locking or allocation of sample data
+        self.callbacks += 1
+        if status:
+            if status.input_overflow:
+                self.input_overflows += 1
+            if status.input_underflow:
+                self.input_underflows += 1
+        self.ring.write(np.frombuffer(indata, dtype=np.int16))
+
+    def stats(self):
+        """Callback and xrun counters for diagnosing dropped audio"""
+        return {
+            "callbacks": self.callbacks,
+            "input_overflows": self.input_overflows,
+            "input_underflows": self.input_underflows,
+        }
+
+    def start(self):
+        """Open the input device once and keep it running"""
+        if self._stream is None:
+            self._stream = sd.RawInputStream(
+                samplerate=self.samplerate,
+                blocksize=self.blocksize,
+                dtype="int16",
+                channels=1,
+                device=self.device,
+                callback=self._callback,
+            )
+            self._stream.start()
+        return self
+
+    def close(self):
+        """Stop and release the input device"""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def reader(self, start=None, preroll_ms=0):
+        """
+        Create a reader positioned at start (default: live audio), moved back by
+        preroll_ms so the first syllables spoken before start are included.
+        """
+        start = self.ring.written if start is None else start
+        preroll = int(self.samplerate * preroll_ms / 1000)
+        return MicReader(self.ring, max(self.ring.oldest(), start - preroll))
@@ -0,0 +1,128 @@
+"""
+Chunked streaming transcription
+Uploads overlapping chunks of a command while the user is still speaking and
+merges the partial transcripts. The short tail is uploaded as soon as they
+pause, so it is usually transcribed before the endpointer decides they stopped
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from speech2text.audio_buffer import encode_wav
+
+
+def _normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_transcripts(parts, max_overlap_words=8):
+    """
+    Join chunk transcripts, dropping the words each chunk repeats from the
+    end of the previous one (the audio overlap shows up in both).
+    """
+    merged = []
+    for part in parts:
+        words = (part or "").split()
+        if not words:
+            continue
+
+        normalized_tail = [_normalize_word(w) for w in merged[-max_overlap_words:]]
+        normalized_head = [_normalize_word(w) for w in words[:max_overlap_words]]
+        overlap = 0
+        for k in range(min(len(normalized_tail), len(normalized_head)), 0, -1):
+            if normalized_tail[-k:] == normalized_head[:k]:
+                overlap = k
+                break
+        merged.extend(words[overlap:])
+
+    return " ".join(merged)
+
+
+class StreamingTranscriber:
+    """Feeds a growing capture buffer to an STT function in overlapping chunks"""
+
+    def __init__(self, transcribe, fs=16000, chunk_seconds=2.0, overlap_seconds=0.5,
+                 min_tail_seconds=0.2, tail_after_seconds=0.25, max_workers=3):
+        self.transcribe = transcribe
+        self.fs = fs
+        self.chunk_samples = int(chunk_seconds * fs)
+        self.step_samples = int((chunk_seconds - overlap_seconds) * fs)
+        self.min_tail_samples = int(min_tail_seconds * fs)
+        # The tail is uploaded after this much silence, not after the endpointer's full hang time
+        self.tail_after_seconds = tail_after_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt-chunk")
+        self._futures = []
+        self._next_start = 0
+        self._tail = None  # futures for the audio since the last chunk, once the user pauses
+        self.tails_dropped = 0
+        self.chunk_latencies = []
+        self.speech_ended_at = None  # perf_counter time of the last voiced frame, set by capture
+
+    def _transcribe_chunk(self, samples, index):
+        started = time.perf_counter()
+        text = self.transcribe(encode_wav(samples, self.fs, name=f"chunk-{index}.wav"))
+        self.chunk_latencies.append(time.perf_counter() - started)
+        return text
+
+    def _submit(self, samples):
+        index = len(self._futures)
+        self._futures.append(self._executor.submit(self._transcribe_chunk, samples, index))
+
+    def _submit_tail(self, buffer, captured):
+        """Futures for the audio no chunk covers yet; none if that is too short to matter"""
+        submitted_end = self._next_start - self.step_samples + self.chunk_samples if self._futures else 0
+        if captured - submitted_end < self.min_tail_samples and self._futures:
+            return []
+        index = len(self._futures)
+        return [self._executor.submit(self._transcribe_chunk, buffer[self._next_start:captured], index)]
+
+    def feed(self, buffer, captured, silence=0.0):
+        """
+        Call after each captured frame with the capture buffer, the number of
+        valid samples in it and the seconds of silence since the user last
+        spoke. Submits every full chunk that is ready, and the tail as soon as
+        the user pauses; if they carry on talking, that tail is thrown away.
+        """
+        if silence < self.tail_after_seconds and self._tail is not None:
+            for future in self._tail:
+                future.cancel()
+            self._tail = None
+            self.tails_dropped += 1
+        if self._tail is not None:
+            return  # still paused, and the tail already covers the audio so far
+
+        while captured - self._next_start >= self.chunk_samples:
+            start = self._next_start
+            # The buffer is append-only, so handing the worker a view is safe
+            self._submit(buffer[start:start + self.chunk_samples])
+            self._next_start += self.step_samples
+        if silence >= self.tail_after_seconds:
+            self._tail = self._submit_tail(buffer, captured)
+
+    def mark_speech_end(self, seconds_ago=0.0):
+        """Note when the user stopped talking, so latency can be measured from there"""
+        self.speech_ended_at = time.perf_counter() - seconds_ago
+
+    def finish(self, buffer, captured):
+        """
+        Wait for all chunks and the tail and return the merged transcript. The
+        tail is only submitted now if no pause was long enough to send it early.
+        """
+        self._futures += self._submit_tail(buffer, captured) if self._tail is None else self._tail
+
+        try:
+            parts = [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=False)
+
+        if not any(parts):
+            return None
+        return merge_transcripts(parts)
+
+    def cancel(self):
+        """Drop any chunks that haven't been uploaded yet"""
+        for future in self._futures + (self._tail or []):
+            future.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,96 @@
+"""
+Speech-to-text backends
+Registry of interchangeable STT engines, selected with ELDA_STT_BACKEND
+"""
+
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+from speech2text.audio_buffer import decode_wav
+
+load_dotenv()
+
+DEFAULT_BACKEND = os.getenv("ELDA_STT_BACKEND", "openai")
+
+_BACKENDS = {}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_backend(name):
+    """Class decorator that makes a backend selectable by name"""
+    def decorator(cls):
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def available_backends():
+    return sorted(_BACKENDS)
+
+
+def get_backend(name=None):
+    """Return the shared instance of a backend, constructing it on first use"""
+    name = name or DEFAULT_BACKEND
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}'. Choose from: {', '.join(available_backends())}")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = _BACKENDS[name]()
+        return _instances[name]
+
+
+class STTBackend:
+    """Base class: turn a 16-bit mono WAV file object into text"""
+
+    name = None
+
+    def transcribe(self, audio_file) -> str:
+        raise NotImplementedError
+
+
+@register_backend("openai")
+class OpenAIWhisperBackend(STTBackend):
+    """Hosted Whisper through the OpenAI API (honours OPENAI_BASE_URL)"""
+
+    def __init__(self, model="whisper-1"):
+        from openai import OpenAI
+        self.model = model
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    def transcribe(self, audio_file) -> str:
+        transcription = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=audio_file
+        )
+        return transcription.text
+
+
+@register_backend("local")
+class LocalWhisperBackend(STTBackend):
+    """Quantized Whisper on the CPU via faster-whisper; works offline"""
+
+    def __init__(self, model_size=None, compute_type=None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The local STT backend needs faster-whisper: pip install faster-whisper")
+
+        self.model_size = model_size or os.getenv("ELDA_LOCAL_WHISPER_MODEL", "base.en")
+        self.compute_type = compute_type or os.getenv("ELDA_LOCAL_WHISPER_COMPUTE", "int8")
+        self.model = WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type)
+
+    def transcribe(self, audio_file) -> str:
+        if hasattr(audio_file, "seek"):
+            audio_file.seek(0)
+        samples, fs = decode_wav(audio_file)
+        if fs != 16000:
+            raise ValueError(f"Local Whisper expects 16 kHz audio, got {fs} Hz")
+
+        audio = samples.astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(audio, beam_size=1, language="en")
+        return " ".join(segment.text.strip() for segment in segments).strip()
@@ -1,290 +1,404 @@
+import atexit
 import os
+import time
+import numpy as np
 import sounddevice as sd
-import wavio
-from zoom_controller.zoom_controller import ZoomController
-from brightness import increase_brightness, decrease_brightness
-from volume import parse_command as volume_parse_command
-from tts_announcer import (
-    announce_brightness_change, 
-    announce_volume_change, 
-    announce_zoom_change, 
-    announce_how_to_triggered,
-    announce_error,
-    introduce_myself 
-)
+from speech2text.endpointer import EnergyEndpointer
+from speech2text.audio_buffer import encode_wav, dump_debug_audio
+from speech2text.streaming_stt import StreamingTranscriber
+from speech2text.stt_backends import get_backend
+from speech2text.intent_matcher import default_matcher
+from speech2text.intent_cache import IntentCache, fingerprint
+from speech2text.command_parser import is_ambiguous
+from speech2text.command_handlers import CommandRegistry, CommandRequest, COMMON_CONFIRMATIONS, ERROR_ACTIVITIES
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
-from google import genai
-from openai import OpenAI
-import requests
-from websocket_client import trigger_electron_howto
 
 load_dotenv()
-print("OPENAI_API_KEY:", os.getenv("OPENAI_API_KEY"))
 
 # ---------------- Keys ---------------- #
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")  # optional, e.g. a local stand-in server
 
-client_openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-client = genai.Client(api_key=GEMINI_KEY)
+# Built on first use (or by warm_up) so importing this module stays fast
+_gemini_client = None
+_gemini_lock = threading.Lock()
+
+def get_gemini_client():
+    """
+    Returns the shared Gemini client, importing google.genai on first use.
+    """
+    global _gemini_client
+    with _gemini_lock:
+        if _gemini_client is None:
+            from google import genai
+            # A hung request would otherwise hold a worker long after we stopped waiting for it
+            http_options = {"timeout": int(GEMINI_TIMEOUT_MS)}
+            if GEMINI_BASE_URL:
+                http_options["base_url"] = GEMINI_BASE_URL
+            _gemini_client = genai.Client(api_key=GEMINI_KEY, http_options=http_options)
+    return _gemini_client
+
+# ---------------- Capture Settings ---------------- #
+CAPTURE_MODE = os.getenv("ELDA_CAPTURE_MODE", "vad")  # "vad" (endpointed) or "fixed" (3 seconds)
+PRE_SPEECH_TIMEOUT = float(os.getenv("ELDA_PRE_SPEECH_TIMEOUT", "4.0"))  # seconds to wait for speech
+HANG_TIME = float(os.getenv("ELDA_HANG_TIME", "0.8"))  # trailing silence that ends a command
+MAX_COMMAND_LENGTH = float(os.getenv("ELDA_MAX_COMMAND_LENGTH", "10.0"))  # hard cap in seconds
+PREROLL_MS = int(os.getenv("ELDA_PREROLL_MS", "300"))  # audio kept from just before the wake word ended
+STT_MODE = os.getenv("ELDA_STT_MODE", "batch")  # "batch" or "streaming" (transcribe while recording)
+DEBUG_AUDIO = os.getenv("ELDA_DEBUG_AUDIO", "0") == "1"  # also dump each command to debug_audio/
+TTS_PREWARM = os.getenv("ELDA_TTS_PREWARM", "1") == "1"  # synthesize known announcements during warm-up
+
+# ---------------- Intent Settings ---------------- #
+LOCAL_INTENT_THRESHOLD = float(os.getenv("ELDA_LOCAL_INTENT_THRESHOLD", "0.9"))  # skip Gemini at or above this
+INTENT_BUDGET_MS = float(os.getenv("ELDA_INTENT_BUDGET_MS", "600"))  # how long we wait for Gemini
+# When the HTTP request itself is abandoned; a little past the budget so answers that just miss it can still be cached
+GEMINI_TIMEOUT_MS = float(os.getenv("ELDA_GEMINI_TIMEOUT_MS", str(INTENT_BUDGET_MS + 400)))
+GEMINI_MAX_IN_FLIGHT = 4
+
+INTENTS = [
+    "introduce_myself",
+    "zoom_in",
+    "zoom_out",
+    "increase_volume",
+    "adjust_volume",
+    "volume_up_50",
+    "volume_down_50",
+    "adjust_brightness",
+    "how_to_do_something",
+    "read_text",
+    "other",
+]
+INTENT_LIST = "\n".join(f"- {intent}" for intent in INTENTS)
+INTENT_PROMPT = """You are an intent classifier for a voice assistant. 
+    
+A user said: "{transcribed_text}"
+
+Analyze the request and return ONLY one of these exact intents:
+{intents}
+
+Return only the intent name, nothing else."""
+
+# How each transcript was classified; "local" + "cache" count the Gemini calls we avoided
+intent_stats = {
+    "local": 0, "cache": 0, "gemini": 0,
+    "keyword_fallback": 0, "deadline_fallback": 0, "invalid_fallback": 0, "busy_fallback": 0,
+    "late_cached": 0,
+}
+
+# Gemini calls run here so a slow response can be abandoned at the deadline. A call
+# is only started when a worker is free: one queued behind hung calls would always
+# miss the budget, so the keywords are used right away instead.
+_intent_executor = ThreadPoolExecutor(max_workers=GEMINI_MAX_IN_FLIGHT, thread_name_prefix="gemini")
+_gemini_slots = threading.BoundedSemaphore(GEMINI_MAX_IN_FLIGHT)
+
+# Gemini answers for repeated commands; entries are dropped when the prompt or intent list changes.
+# Opened on first use (or by warm_up), so importing this module doesn't touch ~/.cache
+_intent_cache = None
+_intent_cache_lock = threading.Lock()
+
+def get_intent_cache():
+    """
+    Returns the shared intent cache, opening its SQLite store on first use.
+    """
+    global _intent_cache
+    with _intent_cache_lock:
+        if _intent_cache is None:
+            _intent_cache = IntentCache(
+                path=os.getenv("ELDA_INTENT_CACHE_PATH"),
+                fingerprint=fingerprint(INTENT_PROMPT, INTENT_LIST),
+                ttl_seconds=float(os.getenv("ELDA_INTENT_CACHE_TTL", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("ELDA_INTENT_CACHE_SIZE", "500")),
+            )
+            atexit.register(_intent_cache.flush)
+    return _intent_cache
 
 # ---------------- Audio Recording ---------------- #
-def record_audio(filename="command.wav", duration=3, fs=16000):
+def record_audio(duration=3, fs=16000):
     """
-    Records audio from the microphone and saves to a WAV file.
+    Records audio from the microphone and returns it as an int16 buffer.
     """
     print(f"🔴 Recording for {duration} seconds...")
     audio = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype='int16')
     sd.wait()
-    wavio.write(filename, audio, fs, sampwidth=2)
-    print(f"✅ Saved audio to {filename}")
-    return filename
+    print(f"✅ Recorded {duration} seconds of audio")
+    return audio[:, 0]
+
+def _input_stream_frames(fs, frame_length):
+    """
+    Yields frames from a short-lived input stream (used when no shared microphone is running).
+    """
+    with sd.InputStream(samplerate=fs, blocksize=frame_length, channels=1, dtype='int16') as stream:
+        while True:
+            frame, overflowed = stream.read(frame_length)
+            if overflowed:
+                print("⚠️ Input overflow while recording")
+            yield frame[:, 0]
 
-# ---------------- Speech-to-Text (OpenAI Whisper) ---------------- #
-def transcribe_whisper(audio_file_path: str) -> str:
+def _reader_frames(reader, frame_length):
     """
-    Transcribe audio using OpenAI Whisper.
+    Yields frames from a reader on the shared microphone ring buffer.
     """
+    while True:
+        yield reader.read(frame_length)
+
+def record_until_silence(fs=16000, frame_ms=30,
+                         pre_speech_timeout=None, hang_time=None, max_length=None,
+                         mic=None, start=None, preroll_ms=None, transcriber=None):
+    """
+    Streams microphone frames into an in-memory buffer and stops as soon as
+    the endpointer hears the user finish. Returns (audio, duration, reason);
+    audio is None when no speech was heard.
+
+    When a shared MicrophoneStream is passed, capture reads from its ring buffer
+    starting at `start` (e.g. where the wake word ended), plus `preroll_ms` of
+    audio before it, instead of opening a second input stream.
+
+    A StreamingTranscriber, if given, is fed the buffer after every frame so
+    chunks are uploaded while the user is still talking, and the tail as soon
+    as they pause.
+    """
+    endpointer = EnergyEndpointer(
+        fs=fs,
+        frame_ms=frame_ms,
+        pre_speech_timeout=PRE_SPEECH_TIMEOUT if pre_speech_timeout is None else pre_speech_timeout,
+        hang_time=HANG_TIME if hang_time is None else hang_time,
+        max_length=MAX_COMMAND_LENGTH if max_length is None else max_length,
+    )
+    frame_length = int(fs * frame_ms / 1000)
+    preroll_ms = PREROLL_MS if preroll_ms is None else preroll_ms
+    buffer = np.empty(int((endpointer.max_length + preroll_ms / 1000) * fs) + frame_length, dtype=np.int16)
+    captured = 0
+
+    if mic is not None:
+        anchor = mic.ring.written if start is None else start
+        reader = mic.reader(start=anchor, preroll_ms=preroll_ms)
+
+        # Pre-roll goes into the clip but not the endpointer, so the tail of
+        # "Hey Elda" is never mistaken for the start of the command
+        preroll = anchor - reader.position
+        if preroll > 0:
+            buffer[:preroll] = reader.read(preroll)
+            captured = preroll
+        frames = _reader_frames(reader, frame_length)
+    else:
+        frames = _input_stream_frames(fs, frame_length)
+
+    print("🔴 Recording until you finish speaking...")
     try:
-        with open(audio_file_path, "rb") as audio_file:
-            transcription = client_openai.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file
-            )
-        text = transcription.text
+        for samples in frames:
+            buffer[captured:captured + len(samples)] = samples
+            captured += len(samples)
+            stop = endpointer.process(samples)
+            if transcriber is not None:
+                transcriber.feed(buffer, captured, endpointer.trailing_silence if endpointer.speech_started else 0.0)
+            if stop:
+                break
+    finally:
+        frames.close()
+
+    if transcriber is not None:
+        # Capture stops a hang time after the last voiced frame; that frame is when the user finished
+        transcriber.mark_speech_end(endpointer.trailing_silence)
+
+    duration = captured / fs
+    if not endpointer.speech_started:
+        print(f"🤫 No speech detected after {duration:.1f} seconds")
+        return None, duration, endpointer.reason
+
+    print(f"✅ Recorded {duration:.2f}s of audio ({endpointer.reason})")
+    return buffer[:captured], duration, endpointer.reason
+
+# ---------------- Speech-to-Text (Whisper backends) ---------------- #
+def transcribe_whisper(audio_file, backend=None) -> str:
+    """
+    Transcribe audio with the configured STT backend (ELDA_STT_BACKEND,
+    OpenAI Whisper by default). Accepts an in-memory WAV file object
+    (see encode_wav) or a path on disk.
+    """
+    try:
+        stt = get_backend(backend)
+        if isinstance(audio_file, (str, os.PathLike)):
+            with open(audio_file, "rb") as f:
+                text = stt.transcribe(f)
+        else:
+            text = stt.transcribe(audio_file)
         print("📝 Transcribed text:", text)
         return text
     except Exception as e:
         print(f"⚠️ Whisper STT error: {e}")
         return None
 
-# ---------------- Keyword-based Intent Detection (Fallback) ---------------- #
+# ---------------- Keyword-based Intent Detection (Local) ---------------- #
 def detect_intent_keywords(transcribed_text: str) -> str:
     """
-    Simple keyword-based intent detection as fallback when Gemini fails.
+    Keyword-based intent detection using the compiled matcher; used as the
+    fallback when Gemini fails.
     """
-    text = transcribed_text.lower()
-    
-    # Introduce myself keywords
-    if any(word in text for word in ["introduce", "who are you", "what are you", "tell me about yourself", "yourself"]):
-        return "introduce_myself"
-    
-    # Zoom keywords
-    if any(word in text for word in ["zoom in", "zoom closer", "closer", "bigger"]):
-        return "zoom_in"
-    elif any(word in text for word in ["zoom out", "zoom away", "smaller", "farther"]):
-        return "zoom_out"
-    
-    # Volume keywords
-    if any(word in text for word in ["volume up 50", "increase volume 50", "volume up by 50"]):
-        return "volume_up_50"
-    elif any(word in text for word in ["volume down 50", "decrease volume 50", "volume down by 50"]):
-        return "volume_down_50"
-    elif any(word in text for word in ["increase volume", "turn up", "louder", "volume up"]):
-        return "increase_volume"
-    elif any(word in text for word in ["decrease volume", "turn down", "quieter", "volume down", "lower volume"]):
-        return "adjust_volume"
-    
-    # Brightness keywords
-    if any(word in text for word in ["brighter", "increase brightness", "brightness up"]):
-        return "adjust_brightness"
-    elif any(word in text for word in ["dimmer", "decrease brightness", "brightness down"]):
-        return "adjust_brightness"
-    
-    # How-to keywords
-    if any(word in text for word in ["how to", "how do i", "help me", "teach me", "show me how"]):
-        return "how_to_do_something"
-    
-    # Read text keywords
-    if any(word in text for word in ["read", "read text", "read clipboard", "what does this say"]):
-        return "read_text"
-    
-    return "other"
+    return default_matcher.match(transcribed_text).intent
 
 # ---------------- Intent Detection (Gemini with Fallback) ---------------- #
 def detect_intent(transcribed_text: str) -> str:
     """
-    Use Gemini to determine the user's intent, with keyword fallback.
+    Determine the user's intent. Previously seen commands come from the
+    intent cache and confident local keyword matches are dispatched
+    immediately. Only new, ambiguous transcripts go to Gemini, and the
+    keyword result is used if Gemini fails, answers with something that
+    isn't a known intent, or misses the ELDA_INTENT_BUDGET_MS deadline.
     """
-    prompt = f"""You are an intent classifier for a voice assistant. 
-    
-A user said: "{transcribed_text}"
+    local = default_matcher.match(transcribed_text)
+    if local.confidence >= LOCAL_INTENT_THRESHOLD and is_ambiguous(transcribed_text, local.intent):
+        # e.g. "turn it up and zoom in" matched as zoom_in: the keywords can't say what "it" is
+        print(f"🔀 Keyword match {local.intent} leaves part of the command unexplained, asking Gemini")
+    elif local.confidence >= LOCAL_INTENT_THRESHOLD:
+        intent_stats["local"] += 1
+        print(f"🎯 Detected intent (local, {local.confidence:.2f}): {local.intent} "
+              f"[{intent_stats['local'] + intent_stats['cache']} Gemini calls avoided]")
+        return local.intent
 
-Analyze the request and return ONLY one of these exact intents:
-- introduce_myself
-- zoom_in
-- zoom_out
-- increase_volume
-- adjust_volume
-- volume_up_50
-- volume_down_50
-- adjust_brightness
-- how_to_do_something
-- read_text
-- other
+    cached = get_intent_cache().get(transcribed_text)
+    if cached:
+        intent_stats["cache"] += 1
+        print(f"🎯 Detected intent (cache): {cached}")
+        return cached
 
-Return only the intent name, nothing else."""
+    if not _gemini_slots.acquire(blocking=False):
+        intent_stats["busy_fallback"] += 1
+        print(f"⏳ Every Gemini call is still running, using keywords: {local.intent}")
+        return local.intent
 
+    # Race Gemini against the latency budget; the local answer is already in hand
+    started = time.perf_counter()
+    future = _intent_executor.submit(_classify_with_gemini, transcribed_text)
+    future.add_done_callback(lambda _: _gemini_slots.release())
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt
-        )
-        
-        intent = response.text.strip().lower()
-        print(f"🎯 Detected intent (Gemini): {intent}")
-        return intent
+        intent = future.result(timeout=INTENT_BUDGET_MS / 1000)
+    except FutureTimeoutError:
+        # The answer still lands in the cache, so the same command is a hit next time;
+        # the client timeout ends the call itself
+        future.add_done_callback(lambda done: _cache_late_intent(transcribed_text, done))
+        intent_stats["deadline_fallback"] += 1
+        print(f"⏰ Gemini missed the {INTENT_BUDGET_MS:.0f} ms budget, using keywords: {local.intent}")
+        return local.intent
     except Exception as e:
         print(f"⚠️ Gemini failed ({e}), using keyword fallback...")
-        intent = detect_intent_keywords(transcribed_text)
-        print(f"🎯 Detected intent (keywords): {intent}")
-        return intent
+        intent_stats["keyword_fallback"] += 1
+        print(f"🎯 Detected intent (keywords): {local.intent}")
+        return local.intent
+
+    if intent not in INTENTS:
+        intent_stats["invalid_fallback"] += 1
+        print(f"⚠️ Gemini returned an unknown intent ({intent!r}), using keywords: {local.intent}")
+        return local.intent
+
+    intent_stats["gemini"] += 1
+    get_intent_cache().put(transcribed_text, intent)
+    print(f"🎯 Detected intent (Gemini, {(time.perf_counter() - started) * 1000:.0f} ms): {intent}")
+    return intent
+
+def _cache_late_intent(transcribed_text, future):
+    """Cache a Gemini answer that arrived after the budget, if it is a known intent"""
+    if future.exception() is not None:
+        return
+    intent = future.result()
+    if intent in INTENTS:
+        intent_stats["late_cached"] += 1
+        get_intent_cache().put(transcribed_text, intent)
+        print(f"🗂️ Cached Gemini's late answer for next time: {intent}")
+
+def _classify_with_gemini(transcribed_text: str) -> str:
+    """
+    Ask Gemini for the intent; returns its cleaned-up answer (not yet validated).
+    """
+    prompt = INTENT_PROMPT.format(transcribed_text=transcribed_text, intents=INTENT_LIST)
+    response = get_gemini_client().models.generate_content(
+        model="gemini-2.0-flash-exp",
+        contents=prompt
+    )
+    return (response.text or "").strip().strip("`'\".").lower()
 
 # ---------------- Command Handling ---------------- #
+# Built once at startup: intent -> handler, with shared controllers
+command_registry = CommandRegistry()
+
 def handle_command(transcribed_text: str, intent: str):
     """
-    Handle different intents based on what Gemini determined.
+    Parse the transcript into typed commands and dispatch each to its handler.
     """
     if not transcribed_text:
         print("No transcription available")
         return
     
-    if intent == "introduce_myself":
-        print("👋 Introduce myself command detected!")
-        introduce_myself()
-    
-    elif intent == "zoom_in":
-        print("🔍 Zoom in command detected!")
-        try:
-            zoom_controller = ZoomController()
-            zoom_controller.zoom_in()
-            announce_zoom_change("zoomed in")
-        except Exception as e:
-            print(f"Error with zoom: {e}")
-            announce_error("zooming in")
-    
-    elif intent == "zoom_out":
-        print("🔍 Zoom out command detected!")
-        try:
-            zoom_controller = ZoomController()
-            zoom_controller.zoom_out()
-            announce_zoom_change("zoomed out")
-        except Exception as e:
-            print(f"Error with zoom: {e}")
-            announce_error("zooming out")
-        
-    elif intent == "read_text":
-        print("📖 Read text command detected!")
-        # TODO: Implement TTS functionality
-        # Example: speak(transcribed_text)
-        
-    elif intent == "increase_volume":
-        print("🔊 Increase volume command detected!")
-        try:
-            volume_parse_command(transcribed_text)
-            announce_volume_change("increased")
-        except Exception as e:
-            print(f"Error with volume: {e}")
-            announce_error("adjusting volume")
-        
-    elif intent == "adjust_volume":
-        print("🔊 Volume command detected!")
-        try:
-            volume_parse_command(transcribed_text)
-            announce_volume_change("adjusted")
-        except Exception as e:
-            print(f"Error with volume: {e}")
-            announce_error("adjusting volume")
-    
-    elif intent == "volume_up_50":
-        print("🔊 Volume up 50% command detected!")
-        try:
-            from volume import increase_volume
-            increase_volume()
-            announce_volume_change("increased by 50%")
-        except Exception as e:
-            print(f"Error with volume: {e}")
-            announce_error("increasing volume")
-    
-    elif intent == "volume_down_50":
-        print("🔊 Volume down 50% command detected!")
-        try:
-            from volume import decrease_volume
-            decrease_volume()
-            announce_volume_change("decreased by 50%")
-        except Exception as e:
-            print(f"Error with volume: {e}")
-            announce_error("decreasing volume")
+    return command_registry.dispatch(CommandRequest(transcribed_text, intent))
 
-    elif intent == "adjust_brightness":
-        print("💡 Brightness command detected!")
-        try:
-            # Determine if it's increase or decrease based on keywords
-            if any(word in transcribed_text.lower() for word in ["increase", "raise", "up", "brighter", "higher"]):
-                increase_brightness()
-                announce_brightness_change("increased")
-            elif any(word in transcribed_text.lower() for word in ["decrease", "lower", "down", "dimmer", "darker"]):
-                decrease_brightness()
-                announce_brightness_change("decreased")
-            else:
-                # Default to increase if unclear
-                increase_brightness()
-                announce_brightness_change("increased")
-        except Exception as e:
-            print(f"Error with brightness: {e}")
-            announce_error("adjusting brightness")
-        
-    elif intent == "how_to_do_something":
-        print("📚 How-to command detected!")
-        
-        try:
-            # Trigger Electron window via WebSocket
-            trigger_electron_howto(transcribed_text)
-            
-            # The Electron frontend will fetch from Flask when it loads
-            print("✅ Electron window triggered!")
-            announce_how_to_triggered()
-        except Exception as e:
-            print(f"Error with how-to: {e}")
-            announce_error("showing the guide")
-        
-    # Additional keyword-based detection for better coverage
-    elif any(word in transcribed_text.lower() for word in ["brightness", "dim", "bright", "increase brightness", "decrease brightness"]):
-        print("💡 Brightness command detected!")
-        try:
-            # Determine if it's increase or decrease based on keywords
-            if any(word in transcribed_text.lower() for word in ["increase", "raise", "up", "brighter", "higher"]):
-                increase_brightness()
-                announce_brightness_change("increased")
-            elif any(word in transcribed_text.lower() for word in ["decrease", "lower", "down", "dimmer", "darker"]):
-                decrease_brightness()
-                announce_brightness_change("decreased")
-            else:
-                # Default to increase if unclear
-                increase_brightness()
-                announce_brightness_change("increased")
-        except Exception as e:
-            print(f"Error with brightness: {e}")
-            announce_error("adjusting brightness")
+# ---------------- Warm-up ---------------- #
+def prewarm_announcements():
+    """Put every fixed announcement and common confirmation in the TTS cache"""
+    import tts_announcer
+    tts_announcer.prewarm(COMMON_CONFIRMATIONS, ERROR_ACTIVITIES.values())
 
-    elif any(word in transcribed_text.lower() for word in ["volume", "louder", "quieter", "mute"]):
-        print("🔊 Volume command detected!")
+def warm_up():
+    """
+    Import heavy modules and build API clients ahead of the first command.
+    voice.py runs this on a background thread once the wake word loop is live.
+    """
+    started = time.perf_counter()
+    steps = [
+        ("tts", lambda: __import__("tts_announcer").get_announcer()),
+        ("gemini", get_gemini_client),
+        ("intent cache", get_intent_cache),
+        ("stt", get_backend),
+        ("electron", lambda: __import__("websocket_client")),
+    ]
+    if TTS_PREWARM:
+        steps.append(("tts cache", prewarm_announcements))
+    for name, step in steps:
         try:
-            volume_parse_command(transcribed_text)
-            announce_volume_change("adjusted")
+            step()
         except Exception as e:
-            print(f"Error with volume: {e}")
-            announce_error("adjusting volume")
+            print(f"⚠️ Warm-up of {name} failed: {e}")
+    print(f"🔥 Warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
 # ---------------- Full Pipeline ---------------- #
-def listen_and_process():
+def listen_and_process(capture_mode=None, mic=None, start=None):
     """
     Full pipeline: record -> transcribe -> detect intent -> handle command
+    Pass the shared MicrophoneStream (and the ring position where the wake word
+    ended) to capture from it instead of opening a new input stream.
     """
     # Step 1: Record audio
-    audio_file = record_audio(duration=3)
+    capture_mode = capture_mode or CAPTURE_MODE
+    transcriber = None
+    if capture_mode == "fixed":
+        audio = record_audio(duration=3)
+        duration = 3.0
+    else:
+        if STT_MODE == "streaming":
+            transcriber = StreamingTranscriber(transcribe_whisper)
+        audio, duration, reason = record_until_silence(mic=mic, start=start, transcriber=transcriber)
+        if audio is None:
+            if transcriber:
+                transcriber.cancel()
+            return
+    print(f"⏱️ Captured {duration:.2f}s of audio")
+    
+    if DEBUG_AUDIO:
+        dump_debug_audio(encode_wav(audio))
     
     # Step 2: Transcribe with Whisper
-    command_text = transcribe_whisper(audio_file)
+    if transcriber:
+        # Most chunks were uploaded while recording; only the tail is left
+        end_of_capture = time.perf_counter()
+        command_text = transcriber.finish(audio, len(audio))
+        finished = time.perf_counter()
+        end_of_speech = transcriber.speech_ended_at or end_of_capture
+        print(f"⚡ Transcript ready {(finished - end_of_speech) * 1000:.0f} ms after end of speech "
+              f"({(finished - end_of_capture) * 1000:.0f} ms after capture stopped): {command_text}")
+    else:
+        # Encode straight into an in-memory WAV; nothing is written to disk
+        command_text = transcribe_whisper(encode_wav(audio))
     
     if not command_text:
         print("⚠️ No transcription available")
@@ -295,12 +409,6 @@ def listen_and_process():
     
     # Step 4: Handle the command based on intent
     handle_command(command_text, intent)
-    
-    # Optional: Clean up audio file
-    try:
-        os.remove(audio_file)
-    except:
-        pass
 
 # For testing standalone
 if __name__ == "__main__":
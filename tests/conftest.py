@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, ".."))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "benchmarks"))
+
+from stub_servers import start_server
+
+FAKE_BIN = os.path.join(TESTS_DIR, "..", "benchmarks", "fake_bin")
+
+
+class FakeSystem:
+    """The fake osascript/pbpaste from benchmarks/fake_bin, their call log and simulated state"""
+
+    def __init__(self, directory):
+        self.log_path = str(directory / "fake_calls.jsonl")
+        self.state_path = str(directory / "fake_state.json")
+
+    def calls(self, tool="osascript"):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path) as f:
+            return [call for call in map(json.loads, f) if call["tool"] == tool]
+
+    def steps(self, call, kind):
+        """How many steps of a kind one logged script ran"""
+        return call["script"].count(f"-- elda step: {kind}")
+
+    @property
+    def volume(self):
+        with open(self.state_path) as f:
+            return json.load(f)["volume"]
+
+    @volume.setter
+    def volume(self, level):
+        # As if the user pressed the volume keys behind Elda's back
+        with open(self.state_path, "w") as f:
+            json.dump({"volume": level}, f)
+
+
+@pytest.fixture
+def fake_system(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", FAKE_BIN + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("ELDA_FAKE_LOG", str(tmp_path / "fake_calls.jsonl"))
+    monkeypatch.setenv("ELDA_FAKE_STATE", str(tmp_path / "fake_state.json"))
+    monkeypatch.setenv("ELDA_FAKE_OSASCRIPT_MS", "0")
+    monkeypatch.delenv("ELDA_FAKE_FAIL_STEPS", raising=False)
+    return FakeSystem(tmp_path)
+
+
+@pytest.fixture
+def stub():
+    """Start a stub API server for the test and shut it down afterwards"""
+    servers = []
+
+    def start(handler, **settings):
+        server, url = start_server(handler, **settings)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
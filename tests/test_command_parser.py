@@ -0,0 +1,109 @@
+import pytest
+
+from speech2text.command_parser import is_ambiguous, parse_commands
+from speech2text.intent_cache import normalize_transcript
+from speech2text.intent_matcher import default_matcher
+
+
+def slots(commands):
+    return [(c.intent, c.direction, c.amount, c.absolute) for c in commands]
+
+
+def test_single_command_takes_the_intents_control():
+    assert slots(parse_commands("turn it up", "increase_volume")) == [("adjust_volume", "up", None, False)]
+
+
+def test_compound_command_on_two_controls():
+    assert slots(parse_commands("make it louder and zoom in", "increase_volume")) == [
+        ("adjust_volume", "up", None, False),
+        ("zoom_in", "up", None, False),
+    ]
+
+
+def test_untargeted_clause_inherits_from_an_earlier_named_control():
+    assert slots(parse_commands("make it brighter and turn it up", "adjust_brightness")) == [
+        ("adjust_brightness", "up", None, False),
+        ("adjust_brightness", "up", None, False),
+    ]
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("turn it up and zoom in", "zoom_in"),
+    ("turn it down and make it brighter", "adjust_brightness"),
+])
+def test_leading_clause_is_not_given_a_control_another_clause_names(text, intent):
+    # The keyword intent came from the second clause, so "it" is unknown
+    assert is_ambiguous(text, intent)
+    commands = parse_commands(text, intent)
+    assert len(commands) == 1
+    assert commands[0].target == {"zoom_in": "zoom", "adjust_brightness": "brightness"}[intent]
+
+
+@pytest.mark.parametrize("text, intent, expected", [
+    ("turn it up and zoom in", "increase_volume", [("adjust_volume", "up"), ("zoom_in", "up")]),
+    ("turn it down and make it brighter", "adjust_volume", [("adjust_volume", "down"), ("adjust_brightness", "up")]),
+])
+def test_leading_clause_takes_an_intent_no_other_clause_explains(text, intent, expected):
+    assert not is_ambiguous(text, intent)
+    assert [(c.intent, c.direction) for c in parse_commands(text, intent)] == expected
+
+
+def test_trailing_control_names_the_clause_before():
+    assert not is_ambiguous("turn it up, the volume", "zoom_in")
+    assert slots(parse_commands("turn it up, the volume", "zoom_in")) == [("adjust_volume", "up", None, False)]
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("turn the volume up to one hundred", 100),
+    ("set the volume to a hundred", 100),
+    ("set the volume to 100", 100),
+    ("set the brightness to twenty five", 25),
+    ("set the volume to one", 1),
+])
+def test_spelled_out_absolute_levels(text, amount):
+    intent = "adjust_brightness" if "brightness" in text else "adjust_volume"
+    (command,) = parse_commands(text, intent)
+    assert (command.amount, command.absolute) == (amount, True)
+
+
+def test_normalized_hundreds():
+    assert normalize_transcript("volume to one hundred") == "volume to 100"
+
+
+@pytest.mark.parametrize("text", [
+    "I'm on a zoom call with my grandson",
+    "the audio on my zoom call is broken",
+])
+def test_other_intent_without_a_change_stays_other(text):
+    assert slots(parse_commands(text, "other")) == [("other", None, None, False)]
+    assert not is_ambiguous(text, "other")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("could you make the sound louder please", [("adjust_volume", "up", None, False)]),
+    ("brightness to fifty", [("adjust_brightness", None, 50, True)]),
+    ("ok so zoom out", [("zoom_out", "down", None, False)]),
+])
+def test_other_intent_still_runs_a_clear_control_command(text, expected):
+    # What the keyword fallback leaves as "other" when Gemini can't answer
+    assert slots(parse_commands(text, "other")) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("mute", ("adjust_volume", None, 0, True)),
+    ("set the volume to 30", ("adjust_volume", None, 30, True)),
+    ("what is the volume", ("adjust_volume", None, None, False)),
+    ("dim the screen", ("adjust_brightness", "down", None, False)),
+    ("make it darker", ("adjust_brightness", "down", None, False)),
+    ("set brightness to 50", ("adjust_brightness", None, 50, True)),
+])
+def test_keywords_alone_handle_common_controls(text, expected):
+    match = default_matcher.match(text)
+    assert match.confidence >= 0.9
+    assert slots(parse_commands(text, match.intent)) == [expected]
+
+
+def test_non_control_intents_keep_the_whole_transcript():
+    (command,) = parse_commands("how do I zoom in on a photo", "how_to_do_something")
+    assert command.intent == "how_to_do_something"
+    assert command.text == "how do I zoom in on a photo"
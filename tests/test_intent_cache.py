@@ -0,0 +1,99 @@
+import types
+
+import pytest
+
+from speech2text import intent_cache
+from speech2text.intent_cache import IntentCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(intent_cache, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "intents.sqlite")
+
+
+def test_equivalent_transcripts_share_an_entry(clock):
+    cache = IntentCache(":memory:")
+    cache.put("Could you make it louder, please?", "increase_volume")
+    assert cache.get("um make it louder") == "increase_volume"
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = IntentCache(":memory:", ttl_seconds=60)
+    cache.put("zoom in", "zoom_in")
+
+    clock.now += 59
+    assert cache.get("zoom in") == "zoom_in"
+    clock.now += 2
+    assert cache.get("zoom in") is None
+    assert cache.stats["expired"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock, path):
+    cache = IntentCache(path, max_entries=2)
+    cache.put("zoom in", "zoom_in")
+    cache.put("zoom out", "zoom_out")
+    assert cache.get("zoom in") == "zoom_in"  # now "zoom out" is the oldest
+
+    cache.put("read this", "read_text")
+    assert cache.get("zoom out") is None
+    assert cache.get("zoom in") == "zoom_in"
+    assert cache.stats["evictions"] == 1
+
+    # Evicted from the database too, not just from memory
+    reopened = IntentCache(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("zoom out") is None
+
+
+def test_entries_survive_a_restart(clock, path):
+    IntentCache(path).put("make it brighter", "adjust_brightness")
+
+    clock.now += 3600
+    assert IntentCache(path).get("make it brighter") == "adjust_brightness"
+
+
+def test_expired_entries_are_dropped_on_load(clock, path):
+    IntentCache(path, ttl_seconds=60).put("zoom in", "zoom_in")
+
+    clock.now += 61
+    reopened = IntentCache(path, ttl_seconds=60)
+    assert len(reopened) == 0
+
+
+def test_changed_prompt_invalidates_the_cache(clock, path):
+    IntentCache(path, fingerprint="v1").put("zoom in", "zoom_in")
+
+    assert IntentCache(path, fingerprint="v1").get("zoom in") == "zoom_in"
+    changed = IntentCache(path, fingerprint="v2")
+    assert changed.get("zoom in") is None
+    assert changed.stats["invalidated"] == 1
+
+
+def test_hits_decide_what_is_warmed_up_after_a_restart(clock, path):
+    cache = IntentCache(path)
+    cache.put("zoom in", "zoom_in")
+    clock.now += 1
+    cache.put("zoom out", "zoom_out")
+    clock.now += 1
+    cache.get("zoom in")
+    cache.flush()
+
+    # Only the most recently used entry fits
+    reopened = IntentCache(path, max_entries=1)
+    assert reopened.get("zoom in") == "zoom_in"
+    assert reopened.get("zoom out") is None
@@ -0,0 +1,56 @@
+import pytest
+
+from script_executor import ScriptError, ScriptExecutor
+
+
+def test_batch_runs_every_step_in_one_process(fake_system):
+    executor = ScriptExecutor()
+    script = executor.batch().get_volume().set_volume(30).adjust_volume(10).exchange_volume(5).key_code(24, ("command",))
+
+    results = script.run()
+
+    assert [(r.ok, r.value) for r in results] == [
+        (True, "50"), (True, "30"), (True, "30->40"), (True, "40->5"), (True, "ok"),
+    ]
+    assert len(fake_system.calls()) == 1
+    assert executor.stats["invocations"] == 1
+    assert executor.stats["steps"] == 5
+    assert fake_system.volume == 5
+
+
+def test_failed_step_does_not_stop_the_rest(fake_system, monkeypatch):
+    monkeypatch.setenv("ELDA_FAKE_FAIL_STEPS", "key_code")
+    executor = ScriptExecutor()
+
+    first, second, third = executor.batch().set_volume(20).key_code(24).get_volume().run()
+
+    assert first.ok and first.value == "20"
+    assert not second.ok and "simulated key_code failure" in second.value
+    assert third.ok and third.value == "20"
+    assert len(fake_system.calls()) == 1
+
+
+def test_delays_run_inside_the_script(fake_system):
+    ScriptExecutor().batch().key_code(24).delay(0.05).key_code(24).run()
+
+    (call,) = fake_system.calls()
+    assert fake_system.steps(call, "key_code") == 2
+    assert call["slept"] == pytest.approx(0.05)
+
+
+def test_empty_batch_spawns_nothing(fake_system):
+    assert ScriptExecutor().batch().run() == []
+    assert fake_system.calls() == []
+
+
+@pytest.mark.parametrize("osascript", ["false", "/nonexistent/osascript"])
+def test_osascript_failure_raises(fake_system, osascript):
+    executor = ScriptExecutor(osascript=osascript)
+    with pytest.raises(ScriptError):
+        executor.batch().get_volume().run()
+    assert executor.stats["failures"] == 1
+
+
+def test_unknown_modifier_is_rejected():
+    with pytest.raises(ValueError):
+        ScriptExecutor().batch().key_code(24, ("hyper",))
@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pytest
+
+from speech2text.audio_buffer import encode_wav
+from speech2text.stt_backends import OpenAIWhisperBackend
+from speech2text.streaming_stt import StreamingTranscriber
+from stub_servers import StubWhisperHandler, WhisperCorpus
+
+FS = 16000
+TRANSCRIPT = "please make the text on my screen a little bigger and then turn the volume down"
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """A 5 second clip of noise (so every chunk can be located) and what is said in it"""
+    samples = np.random.default_rng(7).integers(-3000, 3000, FS * 5, dtype=np.int16)
+    with open(tmp_path / "command.wav", "wb") as f:
+        f.write(encode_wav(samples).getvalue())
+    (tmp_path / "command.txt").write_text(TRANSCRIPT)
+    return samples, WhisperCorpus(str(tmp_path))
+
+
+def test_streaming_transcription_matches_the_recording(stub, recording, monkeypatch):
+    samples, corpus = recording
+    server, url = stub(StubWhisperHandler, corpus=corpus, latency_ms=50)
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{url}/v1")
+    transcriber = StreamingTranscriber(OpenAIWhisperBackend().transcribe)
+
+    # Feed it like capture does, one 30 ms frame at a time
+    frame = int(FS * 0.03)
+    for captured in range(frame, len(samples) + 1, frame):
+        transcriber.feed(samples, captured)
+    uploaded_while_speaking = len(transcriber._futures)
+    text = transcriber.finish(samples, len(samples))
+
+    assert text == TRANSCRIPT
+    assert uploaded_while_speaking >= 2
+    assert server.RequestHandlerClass.requests_served == uploaded_while_speaking + 1
+
+
+def test_short_command_is_one_request(stub, recording, monkeypatch):
+    samples, corpus = recording
+    server, url = stub(StubWhisperHandler, corpus=corpus, latency_ms=0)
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{url}/v1")
+    transcriber = StreamingTranscriber(OpenAIWhisperBackend().transcribe)
+
+    short = samples[:FS]
+    transcriber.feed(short, len(short))
+    assert transcriber.finish(short, len(short)) == " ".join(TRANSCRIPT.split()[:3])
+    assert server.RequestHandlerClass.requests_served == 1
+
+
+def test_tail_is_transcribed_during_the_hang_time(stub, recording, monkeypatch):
+    samples, corpus = recording
+    server, url = stub(StubWhisperHandler, corpus=corpus, latency_ms=200)
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{url}/v1")
+    transcriber = StreamingTranscriber(OpenAIWhisperBackend().transcribe)
+
+    # Speech with a short pause at 2.5 s, then 0.8 s of hang time at the end
+    frame = int(FS * 0.03)
+    pause, end = range(int(2.5 * FS), int(2.8 * FS)), len(samples) - int(0.8 * FS)
+    spoken = None
+    for captured in range(frame, len(samples) + 1, frame):
+        if captured in pause:
+            silence = (captured - pause.start) / FS
+        else:
+            silence = max(0, captured - end) / FS
+        transcriber.feed(samples, captured, silence)
+        if captured > end:
+            if spoken is None and silence >= transcriber.tail_after_seconds:
+                spoken = captured
+            time.sleep(frame / FS)  # the hang time passes in real time
+
+    started = time.perf_counter()
+    text = transcriber.finish(samples, len(samples))
+    waited = time.perf_counter() - started
+
+    # The pause's tail was dropped when speech resumed; the final one ran during the hang time
+    assert transcriber.tails_dropped == 1
+    # The stub spreads the words over the whole clip, so the hang time "holds" a few
+    assert text == corpus.lookup(samples[:spoken], FS)
+    assert waited < 0.1
@@ -0,0 +1,133 @@
+import sys
+import time
+import types
+
+import pytest
+
+from stub_servers import StubElevenLabsHandler
+
+
+@pytest.fixture
+def announcer(stub, tmp_path, monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    tts_announcer = pytest.importorskip("tts_announcer")
+    from tts_cache import TTSAudioCache
+
+    _, url = stub(StubElevenLabsHandler, latency_ms=0, stream_latency_ms=50, realtime_factor=4.0)
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "stub")
+    monkeypatch.setenv("ELEVENLABS_BASE_URL", f"{url}/v1")
+    return tts_announcer.EldaTTSAnnouncer(cache=TTSAudioCache(str(tmp_path / "tts")), streaming=True)
+
+
+def test_synthesis_streams_pcm_in_chunks(announcer):
+    text = "I've increased your volume by fifty percent"
+    chunks = list(announcer._synthesize_stream(text, timeout=5))
+
+    # The stub sends silence as long as the text takes to say
+    seconds = max(0.2, len(text) / StubElevenLabsHandler.chars_per_second)
+    assert b"".join(chunks) == bytes(2 * int(seconds * announcer.stream_rate))
+    assert len(chunks) > 1
+
+
+def test_first_chunk_arrives_before_synthesis_finishes(announcer):
+    text = "This sentence is long enough to take a while to synthesize in full"
+    started = time.perf_counter()
+    stream = announcer._synthesize_stream(text, timeout=5)
+    next(stream)
+    first = time.perf_counter() - started
+    for _ in stream:
+        pass
+    total = time.perf_counter() - started
+
+    assert first < total / 2
+
+
+def test_cached_stream_falls_back_when_the_device_fails(announcer):
+    from tts_cache import cache_key
+
+    text = "zoomed in"
+    key = cache_key(announcer.voice_id, announcer.model_id, announcer.voice_settings, text, announcer.stream_format)
+    announcer.cache.put(key, b"\0\0" * 2205, text=text)
+
+    def no_device(*args, **kwargs):
+        raise OSError("no output device")
+
+    announcer._play_clip = no_device
+    assert announcer._stream_speech(text, timeout=5) is None
+
+
+def test_download_that_misses_the_deadline_is_cached_for_next_time(stub, tmp_path, monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    tts_announcer = pytest.importorskip("tts_announcer")
+    from tts_cache import TTSAudioCache, cache_key
+
+    # The stream starts too late and the full clip arrives just after the deadline
+    _, url = stub(StubElevenLabsHandler, latency_ms=300, stream_latency_ms=800)
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "stub")
+    monkeypatch.setenv("ELEVENLABS_BASE_URL", f"{url}/v1")
+    announcer = tts_announcer.EldaTTSAnnouncer(cache=TTSAudioCache(str(tmp_path / "tts")), streaming=True)
+    announcer.deadline_ms = 500
+    announcer.local_voice = None
+    announcer.pcm_cache = None
+    played = []
+
+    def drain(chunks, stop=None, samplerate=None, channels=1):
+        for chunk in chunks:
+            played.append(chunk)
+        return True
+
+    announcer._play_pcm = drain
+    announcer._play_audio = lambda audio_data, stop=None: played.append(audio_data) or True
+
+    text = "I've turned the volume down"
+    announcer.speak(text)
+    assert announcer.utterances[-1][0] == "silent"
+
+    key = cache_key(announcer.voice_id, announcer.model_id, announcer.voice_settings, text)
+    waited = time.perf_counter()
+    while key not in announcer.cache and time.perf_counter() - waited < 5:
+        time.sleep(0.02)
+
+    announcer.speak(text)
+    assert announcer.utterances[-1][0] == "cache"
+    assert played
+
+
+class FakeOutputStream:
+    opened = []
+
+    def __init__(self, samplerate, channels, dtype):
+        self.format = (samplerate, channels)
+        self.written = 0
+        self.closed = False
+        FakeOutputStream.opened.append(self)
+
+    def start(self):
+        pass
+
+    def write(self, data):
+        self.written += len(data)
+
+    def stop(self):
+        pass
+
+    abort = stop
+
+    def close(self):
+        self.closed = True
+
+
+def test_output_stream_is_reused_until_the_format_changes(announcer, monkeypatch):
+    fake = types.SimpleNamespace(RawOutputStream=FakeOutputStream, PortAudioError=OSError)
+    monkeypatch.setitem(sys.modules, "sounddevice", fake)
+    FakeOutputStream.opened = []
+
+    clip = b"\0\0" * 4410
+    announcer._play_pcm([clip], samplerate=22050)
+    announcer._play_pcm([clip], samplerate=22050)
+    first, = FakeOutputStream.opened
+    assert first.written == 2 * len(clip) and not first.closed
+
+    announcer._play_pcm([clip], samplerate=44100)
+    assert len(FakeOutputStream.opened) == 2 and first.closed
+    assert announcer.output_stats == {"opens": 2, "reuses": 1}
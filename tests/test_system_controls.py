@@ -0,0 +1,218 @@
+import threading
+
+import pytest
+
+import brightness
+from brightness import BrightnessController, KeyPressBackend
+from volume import VolumeState
+from speech2text.command_handlers import CommandRegistry, CommandRejected
+from speech2text.command_parser import parse_commands
+from zoom_controller.zoom_controller import ZoomController
+
+
+# ---------------- Volume ---------------- #
+def test_volume_reads_are_cached(fake_system):
+    state = VolumeState(ttl=60)
+
+    assert state.get() == 50
+    assert state.get() == 50
+    assert len(fake_system.calls()) == 1
+    assert state.stats["cache_hits"] == 1
+
+
+def test_volume_change_reads_and_writes_in_one_call(fake_system):
+    state = VolumeState(ttl=60)
+
+    assert state.adjust(20) == (50, 70)
+    assert state.adjust(-30) == (70, 40)
+    assert len(fake_system.calls()) == 2
+    assert fake_system.volume == 40
+
+
+def test_concurrent_changes_are_coalesced(fake_system, monkeypatch):
+    # Slow enough that every change arrives while the first write is in flight
+    monkeypatch.setenv("ELDA_FAKE_OSASCRIPT_MS", "300")
+    state = VolumeState(ttl=60)
+    start = threading.Barrier(6)
+
+    def louder():
+        start.wait()
+        state.adjust(5)
+
+    threads = [threading.Thread(target=louder) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_system.volume == 80
+    assert state.level == 80
+    assert len(fake_system.calls()) <= 2
+    assert state.stats["coalesced"] >= 4
+
+
+def test_volume_changed_elsewhere_is_corrected(fake_system):
+    state = VolumeState(ttl=60)
+    state.get()
+    fake_system.volume = 10
+
+    assert state.adjust(5) == (10, 15)
+    assert fake_system.volume == 15
+    assert state.stats["mismatches"] == 1
+    assert len(fake_system.calls()) == 3  # read, write from the stale level, corrected write
+
+
+# ---------------- Brightness (key presses) ---------------- #
+@pytest.fixture
+def key_brightness(fake_system):
+    return BrightnessController(KeyPressBackend(), ramp=False)
+
+
+def test_unknown_brightness_is_set_without_bottoming_out(fake_system, key_brightness):
+    assert key_brightness.set(0.75) == 0.75
+    assert key_brightness.estimated
+
+    (call,) = fake_system.calls()
+    assert fake_system.steps(call, f"key_code {brightness.UP_KEY}") == 4  # from the assumed 50%
+    assert fake_system.steps(call, f"key_code {brightness.DOWN_KEY}") == 0
+
+
+def test_brightness_changes_are_one_call_each(fake_system, key_brightness):
+    key_brightness.set(0.5)  # the assumed level: nothing to press
+    assert fake_system.calls() == []
+
+    assert key_brightness.adjust(0.25) == 0.75
+    assert key_brightness.set(0.25) == 0.25
+
+    up, down = fake_system.calls()
+    assert fake_system.steps(up, f"key_code {brightness.UP_KEY}") == 4
+    assert fake_system.steps(down, f"key_code {brightness.DOWN_KEY}") == 8
+    assert down["slept"] == pytest.approx(7 * brightness.KEY_DELAY)
+
+
+def test_estimated_brightness_stays_an_estimate(fake_system, key_brightness, monkeypatch):
+    key_brightness.set(0.5)
+    key_brightness.adjust(0.25)
+    assert (key_brightness.level, key_brightness.estimated) == (0.75, True)
+
+    monkeypatch.setattr(brightness, "_controller", key_brightness)
+    registry = CommandRegistry()
+    (command,) = parse_commands("set brightness to 50", "adjust_brightness")
+    assert registry.adjust_brightness(command) == "set your screen brightness to about 50 percent"
+
+
+class ReadableBackend:
+    name = "fake"
+    readable = True
+
+    def __init__(self, level):
+        self.level = level
+
+    def get(self):
+        return self.level
+
+    def set(self, level, current=None, ramp=False):
+        self.level = level
+        return level
+
+
+def test_read_brightness_is_not_an_estimate():
+    controller = BrightnessController(ReadableBackend(0.3), ramp=False)
+    assert controller.set(0.6) == 0.6
+    assert not controller.estimated
+
+
+def test_untracked_brightness_is_nudged(fake_system, key_brightness):
+    assert key_brightness.adjust(-0.25) is None
+
+    (call,) = fake_system.calls()
+    assert fake_system.steps(call, f"key_code {brightness.DOWN_KEY}") == 4
+
+
+def test_failed_brightness_key_raises(fake_system, key_brightness, monkeypatch):
+    monkeypatch.setenv("ELDA_FAKE_FAIL_STEPS", "key_code")
+    with pytest.raises(RuntimeError):
+        key_brightness.adjust(0.25)
+
+
+# ---------------- Zoom ---------------- #
+def test_zoom_steps_share_one_script(fake_system):
+    zoom = ZoomController()
+
+    assert zoom.zoom_in(3)
+    assert zoom.current_zoom == 2.5
+    (call,) = fake_system.calls()
+    assert fake_system.steps(call, "key_code") == 3
+    assert fake_system.steps(call, "delay") == 2
+
+
+def test_zoom_to_and_reset_use_the_tracked_level(fake_system):
+    zoom = ZoomController()
+    zoom.zoom_to(3)
+    zoom.zoom_to(2)
+    zoom.reset_zoom()
+
+    to_three, to_two, reset = fake_system.calls()
+    assert fake_system.steps(to_three, "key_code 24") == 4
+    assert fake_system.steps(to_two, "key_code 27") == 2
+    assert fake_system.steps(reset, "key_code 27") == 2 + 2  # back to 1x plus the overshoot
+    assert zoom.current_zoom == 1.0
+
+
+def test_already_at_level_spawns_nothing(fake_system):
+    zoom = ZoomController()
+    zoom.zoom_to(2)
+    assert zoom.zoom_to(2)
+    assert len(fake_system.calls()) == 1
+
+
+def test_toggle_tracks_the_level(fake_system):
+    zoom = ZoomController()
+    zoom.zoom_to(3)
+
+    zoom.zoom_toggle()
+    assert zoom.current_zoom == 1.0
+    zoom.zoom_toggle()
+    assert zoom.current_zoom == 3.0
+
+
+def test_toggle_to_an_unknown_level(fake_system):
+    zoom = ZoomController()
+    zoom.zoom_toggle()
+    assert zoom.current_zoom is None
+
+    assert zoom.zoom_to(2)
+    assert zoom.current_zoom == 2.0
+
+
+def test_failed_zoom_keeps_the_tracked_level(fake_system, monkeypatch):
+    zoom = ZoomController()
+    monkeypatch.setenv("ELDA_FAKE_FAIL_STEPS", "key_code")
+
+    assert not zoom.zoom_in(2)
+    assert zoom.current_zoom == 1.0
+
+
+@pytest.mark.parametrize("text, level", [
+    ("zoom to 200 percent", 2.0),
+    ("zoom to 200", 2.0),
+    ("zoom to 1.5x", 1.5),
+    ("zoom in by 50 percent", 1.5),
+])
+def test_spoken_zoom_levels(fake_system, text, level):
+    registry = CommandRegistry()
+    (command,) = parse_commands(text, "zoom_in")
+
+    assert registry.zoom_in(command) == f"set the zoom to {level:g} times"
+    assert registry.zoom_controller.current_zoom == level
+
+
+@pytest.mark.parametrize("text", ["zoom to 5000 percent", "zoom to 50 percent"])
+def test_out_of_range_zoom_is_refused(fake_system, text):
+    registry = CommandRegistry()
+    (command,) = parse_commands(text, "zoom_in")
+
+    with pytest.raises(CommandRejected, match="zoom only goes from 1 to"):
+        registry.zoom_in(command)
+    assert registry.zoom_controller.current_zoom == 1.0
+    assert not fake_system.calls()
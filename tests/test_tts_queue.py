@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from tts_queue import PRIORITY_CONFIRMATION, PRIORITY_ERROR, PRIORITY_INFO, AnnouncementQueue
+
+TIMEOUT = 5
+
+
+class FakePlayer:
+    """Records what was said in full and what was cut off; held messages play until released or stopped"""
+
+    def __init__(self):
+        self.played = []
+        self.interrupted = []
+        self.started = {}
+        self.release = {}
+
+    def hold(self, message):
+        self.started[message] = threading.Event()
+        self.release[message] = threading.Event()
+
+    def speak(self, message, stop):
+        if message in self.release:
+            self.started[message].set()
+            while not self.release[message].is_set() and not stop.wait(0.005):
+                pass
+        if stop.is_set():
+            self.interrupted.append(message)
+            return False
+        self.played.append(message)
+        return True
+
+
+@pytest.fixture
+def player():
+    return FakePlayer()
+
+
+@pytest.fixture
+def announcements(player):
+    return AnnouncementQueue(speak=player.speak)
+
+
+def start_speaking(player, announcements, message):
+    """Submit a message and wait until the worker is busy saying it"""
+    player.hold(message)
+    future = announcements.submit(message, PRIORITY_INFO)
+    assert player.started[message].wait(TIMEOUT)
+    return future
+
+
+def test_errors_go_before_confirmations_before_info(player, announcements):
+    start_speaking(player, announcements, "I'm listening")
+    announcements.submit("first guide", PRIORITY_INFO)
+    announcements.submit("zoomed in", PRIORITY_CONFIRMATION)
+    announcements.submit("second guide", PRIORITY_INFO)
+    announcements.submit("volume failed", PRIORITY_ERROR)
+    announcements.submit("muted your volume", PRIORITY_CONFIRMATION)
+
+    player.release["I'm listening"].set()
+    assert announcements.wait_idle(TIMEOUT)
+    assert player.played == [
+        "I'm listening", "volume failed", "zoomed in", "muted your volume", "first guide", "second guide",
+    ]
+
+
+def test_barge_in_stops_the_current_announcement_and_drops_the_queue(player, announcements):
+    current = start_speaking(player, announcements, "a long how-to explanation")
+    queued = [announcements.submit(message) for message in ("zoomed in", "muted your volume")]
+
+    announcements.barge_in()
+    assert announcements.wait_idle(TIMEOUT)
+    assert current.result(TIMEOUT) is False
+    assert all(future.cancelled() for future in queued)
+    assert player.interrupted == ["a long how-to explanation"]
+    assert player.played == []
+
+    # What is asked for after the wake word is said as usual
+    assert announcements.submit("I'm listening").result(TIMEOUT) is True
+    assert player.played == ["I'm listening"]
+
+
+def test_cancelling_one_announcement_leaves_the_rest(player, announcements):
+    start_speaking(player, announcements, "I'm listening")
+    dropped = announcements.submit("zoomed in")
+    kept = announcements.submit("muted your volume")
+    dropped.cancel()
+
+    player.release["I'm listening"].set()
+    assert kept.result(TIMEOUT) is True
+    assert player.played == ["I'm listening", "muted your volume"]
+    assert announcements.stats["cancelled"] == 1
+
+
+def test_waiting_duplicates_are_said_once(player, announcements):
+    start_speaking(player, announcements, "I'm listening")
+    first = announcements.submit("volume failed", PRIORITY_ERROR)
+    again = announcements.submit("volume failed", PRIORITY_ERROR)
+    read = [announcements.submit("the article", PRIORITY_INFO, speak=player.speak) for _ in range(2)]
+
+    player.release["I'm listening"].set()
+    assert announcements.wait_idle(TIMEOUT)
+    assert again is first and first.result() is True
+    assert read[0] is not read[1]  # texts with their own speaker are never merged
+    assert player.played == ["I'm listening", "volume failed", "the article", "the article"]
+    assert announcements.stats["deduplicated"] == 1
+
+    # Once said, the same message can be queued again
+    assert announcements.submit("volume failed", PRIORITY_ERROR).result(TIMEOUT) is True
@@ -3,64 +3,201 @@ Elda Text-to-Speech Announcer
 Uses ElevenLabs API to announce task completion and status updates
 """
 
+import atexit
 import os
+import importlib.util
 import requests
 import io
+import statistics
 import pygame
 from dotenv import load_dotenv
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from tts_cache import DecodedAudioCache, PCMClip, TTSAudioCache, cache_key
+from tts_local import LocalVoice
+from tts_queue import PRIORITY_ERROR, PRIORITY_INFO, announce
 
 load_dotenv()
 
+USE_CACHE = os.getenv("ELDA_TTS_CACHE", "1") == "1"
+STREAMING = os.getenv("ELDA_TTS_STREAMING", "1") == "1"  # start playback on the first audio chunk
+STREAM_SAMPLE_RATE = int(os.getenv("ELDA_TTS_STREAM_RATE", "22050"))  # ElevenLabs offers 16000/22050/24000/44100
+STREAM_CHUNK_BYTES = 4096
+DEADLINE_MS = float(os.getenv("ELDA_TTS_DEADLINE_MS", "1500"))  # how long we wait for ElevenLabs to start
+STREAM_SHARE = 0.6  # part of that budget the stream gets before falling back to a full download
+REQUEST_TIMEOUT = float(os.getenv("ELDA_TTS_TIMEOUT", "20"))  # hard cap on any ElevenLabs request
+USE_LOCAL_VOICE = os.getenv("ELDA_TTS_LOCAL", "1") == "1"  # offline voice when ElevenLabs can't answer in time
+PCM_PLAYBACK = os.getenv("ELDA_TTS_PCM", "1") == "1"  # decode once, replay from memory via sounddevice
+TIERS = ("memory", "cache", "stream", "remote", "local", "silent")
+
+# Fixed announcements, prewarmed into the audio cache
+INTRODUCTION = "Hi I'm Elda, your personal digital assistant. How can I help you?"
+HOW_TO_MESSAGE = "I'm showing you a helpful guide for that task"
+LISTENING_MESSAGE = "I'm listening, how can I help you?"
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+_shared_announcer = None
+_shared_announcer_lock = threading.Lock()
+_mixer_lock = threading.Lock()
+mixer_stats = {"inits": 0, "init_ms": 0.0}
+
+# Full downloads run here so a slow one can be abandoned at the deadline;
+# it still finishes in the background and lands in the cache for next time
+_remote_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts")
+
+def get_audio_cache():
+    """The process-wide TTS audio cache, opened on first use"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TTSAudioCache()
+        return _shared_cache
+
+def get_announcer():
+    """The process-wide announcer, so the HTTP session and mixer are set up once"""
+    global _shared_announcer
+    with _shared_announcer_lock:
+        if _shared_announcer is None:
+            _shared_announcer = EldaTTSAnnouncer()
+            atexit.register(_shared_announcer.close_output)
+        return _shared_announcer
+
+def init_mixer():
+    """Initialize the pygame mixer unless it already is; returns whether it is ready"""
+    with _mixer_lock:
+        if pygame.mixer.get_init():
+            return True
+        started = time.perf_counter()
+        try:
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"⚠️ Audio system initialization failed: {e}")
+            return False
+        mixer_stats["inits"] += 1
+        mixer_stats["init_ms"] += (time.perf_counter() - started) * 1000
+        print(f"✓ Audio system initialized in {mixer_stats['init_ms']:.0f} ms")
+        return True
+
+def action_message(actions):
+    """One sentence confirming one or more completed actions"""
+    if len(actions) > 1:
+        actions = [", ".join(actions[:-1]) + " and " + actions[-1]]
+    return f"I've {actions[0]}"
+
+def error_message(error_description):
+    return f"I encountered an issue: {error_description}"
+
 class EldaTTSAnnouncer:
     """Text-to-Speech announcer for Elda using ElevenLabs"""
     
-    def __init__(self):
-        self.api_key = os.getenv("ELEVENLABS_API_KEY")
+    def __init__(self, cache=None, streaming=None):
+        self.api_key = os.getenv("ELEVENLABS_API_KEY") or os.getenv("ELEVEN_KEY")  # the older name still works
         self.voice_id = os.getenv("ELEVENLABS_VOICE_ID", "pNInz6obpgDQGcFmaJgB")  # Default voice ID
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1")
+        self.model_id = "eleven_monolingual_v1"
+        self.voice_settings = {
+            "stability": 0.5,
+            "similarity_boost": 0.5
+        }
+        self.cache = cache if cache is not None else (get_audio_cache() if USE_CACHE else None)
+        self.streaming = STREAMING if streaming is None else streaming
+        self.stream_rate = STREAM_SAMPLE_RATE
+        self.stream_format = f"pcm_{STREAM_SAMPLE_RATE}"
+        self.first_audio_ms = []  # time to first sound of each streamed utterance
+        self._first_audio_at = None
+        self.deadline_ms = DEADLINE_MS
+        self.local_voice = LocalVoice() if USE_LOCAL_VOICE else None
+        # Decoded clips of recent phrases; None plays MP3 through pygame each time
+        self.pcm_cache = DecodedAudioCache() if PCM_PLAYBACK and importlib.util.find_spec("sounddevice") else None
+        # One output stream, kept open between utterances and reopened only for another format
+        self._output = None
+        self._output_format = None
+        self._output_lock = threading.Lock()
+        self.output_stats = {"opens": 0, "reuses": 0}
+        # Which tier served each utterance, and how long until it started playing
+        self.tier_stats = {tier: 0 for tier in TIERS}
+        self.utterances = deque(maxlen=200)  # (tier, latency_ms, message)
+
+        # Keep-alive session: only the first request pays for the TLS handshake
+        self.session = requests.Session()
+        if self.api_key:
+            self.session.headers["xi-api-key"] = self.api_key
+        self.stats = {"requests": 0, "new_connections": 0, "reused_connections": 0}
         
-        # Initialize pygame mixer for audio playback
+        # Initialize pygame mixer for audio playback (once per process)
+        init_mixer()
+    
+    def _connections_opened(self):
+        """Connections the session's pools have opened so far"""
+        pools = self.session.get_adapter(self.base_url).poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def _request(self, method, url, **kwargs):
+        """Send through the shared session and count whether a connection was reused"""
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = REQUEST_TIMEOUT
+        opened = self._connections_opened()
         try:
-            pygame.mixer.init()
-            print("✓ Audio system initialized")
-        except Exception as e:
-            print(f"⚠️ Audio system initialization failed: {e}")
+            return self.session.request(method, url, **kwargs)
+        finally:
+            self.stats["requests"] += 1
+            if self._connections_opened() > opened:
+                self.stats["new_connections"] += 1
+            else:
+                self.stats["reused_connections"] += 1
+
+    def connection_stats(self):
+        """Request, connection reuse and mixer initialization counters"""
+        return {**self.stats, "mixer_inits": mixer_stats["inits"], "mixer_init_ms": mixer_stats["init_ms"]}
     
-    def _generate_speech(self, text, voice_id=None):
-        """Generate speech audio from text using ElevenLabs API"""
+    def _generate_speech(self, text, voice_id=None, cacheable=True, voice_settings=None):
+        """
+        Generate speech audio from text, from the audio cache or the ElevenLabs
+        API. One-off text (e.g. an article being read) passes cacheable=False so
+        it doesn't evict the announcements.
+        """
+        voice_id = voice_id or self.voice_id
+        voice_settings = voice_settings or self.voice_settings
+        key = cache_key(voice_id, self.model_id, voice_settings, text)
+        cache = self.cache if cacheable else None
+        if cache is not None:
+            audio_data = cache.get(key)
+            if audio_data:
+                return audio_data
+
         if not self.api_key:
             print("⚠️ ElevenLabs API key not found. Set ELEVENLABS_API_KEY in .env")
             return None
         
-        voice_id = voice_id or self.voice_id
-        
         url = f"{self.base_url}/text-to-speech/{voice_id}"
         headers = {
             "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key
+            "Content-Type": "application/json"
         }
         
         data = {
             "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.5
-            }
+            "model_id": self.model_id,
+            "voice_settings": voice_settings
         }
         
         try:
-            response = requests.post(url, json=data, headers=headers)
+            response = self._request("POST", url, json=data, headers=headers)
             response.raise_for_status()
-            return response.content
         except requests.exceptions.RequestException as e:
             print(f"✗ ElevenLabs API error: {e}")
             return None
+
+        if cache is not None:
+            cache.put(key, response.content, text=text, voice_id=voice_id)
+        return response.content
     
-    def _play_audio(self, audio_data):
-        """Play audio data using pygame"""
+    def _play_audio(self, audio_data, stop=None):
+        """Play audio data using pygame until it ends or `stop` is set; False if it couldn't play"""
+        stop = stop or threading.Event()
         try:
             # Create audio stream from bytes
             audio_stream = io.BytesIO(audio_data)
@@ -69,85 +206,322 @@ class EldaTTSAnnouncer:
             pygame.mixer.music.load(audio_stream)
             pygame.mixer.music.play()
             
-            # Wait for playback to complete
+            # Wait for playback to complete, or cut it off
             while pygame.mixer.music.get_busy():
-                time.sleep(0.01)
+                if stop.wait(0.01):
+                    pygame.mixer.music.stop()
+                    break
                 
         except Exception as e:
             print(f"✗ Audio playback error: {e}")
+            return False
+        return True
+    
+    def _synthesize_stream(self, text, voice_id=None, timeout=None):
+        """
+        Yield raw 16-bit PCM from the ElevenLabs streaming endpoint as it
+        arrives. `timeout` bounds the wait for the response and for each chunk.
+        """
+        voice_id = voice_id or self.voice_id
+        response = self._request(
+            "POST", f"{self.base_url}/text-to-speech/{voice_id}/stream",
+            params={"output_format": self.stream_format},
+            json={"text": text, "model_id": self.model_id, "voice_settings": self.voice_settings},
+            headers={"Content-Type": "application/json"},
+            stream=True,
+            timeout=timeout,
+        )
+        with response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=STREAM_CHUNK_BYTES)
+
+    def _first_audio(self, started):
+        self._first_audio_at = time.perf_counter()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.first_audio_ms.append(elapsed_ms)
+        print(f"⏱️ First audio after {elapsed_ms:.0f} ms")
+
+    def _output_stream(self, samplerate, channels):
+        """The open output stream for this format; only a format change reopens the device"""
+        import sounddevice as sd
+
+        if self._output is not None and self._output_format != (samplerate, channels):
+            self.close_output()
+        if self._output is None:
+            self._output = sd.RawOutputStream(samplerate=samplerate, channels=channels, dtype="int16")
+            self._output_format = (samplerate, channels)
+            self.output_stats["opens"] += 1
+        else:
+            self.output_stats["reuses"] += 1
+        return self._output
+
+    def close_output(self):
+        """Close the shared output stream (at exit, or after a device error)"""
+        if self._output is not None:
+            try:
+                self._output.close()
+            except Exception as e:
+                print(f"⚠️ Could not close the audio output: {e}")
+            self._output = None
+            self._output_format = None
+
+    def _play_pcm(self, chunks, stop=None, samplerate=None, channels=1):
+        """
+        Play 16-bit PCM chunks through the shared output stream as they come
+        in. Returns False if `stop` cut playback off.
+        """
+        import sounddevice as sd
+
+        started = time.perf_counter()
+        frame_bytes = 2 * channels
+        pending = b""
+        first = True
+        with self._output_lock:
+            stream = self._output_stream(samplerate or self.stream_rate, channels)
+            try:
+                stream.start()
+                for chunk in chunks:
+                    if stop is not None and stop.is_set():
+                        stream.abort()  # drop what is buffered instead of draining it
+                        return False
+                    data = pending + chunk
+                    usable = len(data) - len(data) % frame_bytes  # whole frames only
+                    pending = data[usable:]
+                    if not usable:
+                        continue
+                    if first:
+                        self._first_audio(started)
+                        first = False
+                    stream.write(data[:usable])
+                stream.stop()  # waits for the buffered audio to play; the device stays open
+            except sd.PortAudioError:
+                self.close_output()  # the device went away; reopened on the next utterance
+                raise
+            except BaseException:
+                stream.abort()  # e.g. the download failed part way
+                raise
+        return True
+
+    def _play_clip(self, clip, stop=None):
+        """Play a decoded clip, written in pieces so it can be cut off between them"""
+        step = STREAM_CHUNK_BYTES - STREAM_CHUNK_BYTES % (2 * clip.channels)
+        samples = clip.samples
+        return self._play_pcm((samples[i:i + step] for i in range(0, len(samples), step)),
+                              stop, clip.samplerate, clip.channels)
+
+    def _decode(self, key, audio_data):
+        """MP3 bytes as a PCMClip in the mixer's format, decoded once and kept in memory"""
+        clip = self.pcm_cache.get(key)
+        if clip is not None:
+            return clip
+        frequency, size, channels = pygame.mixer.get_init() or (0, 0, 0)
+        if size != -16:
+            return None
+        started = time.perf_counter()
+        try:
+            sound = pygame.mixer.Sound(file=io.BytesIO(audio_data))
+        except Exception as e:
+            print(f"✗ Could not decode audio: {e}")
+            return None
+        clip = PCMClip(sound.get_raw(), frequency, channels)
+        decode_ms = (time.perf_counter() - started) * 1000
+        self.pcm_cache.put(key, clip, decode_ms=decode_ms)
+        print(f"🎛️ Decoded {clip.duration:.1f}s of audio in {decode_ms:.0f} ms "
+              f"({len(self.pcm_cache)} clips, {self.pcm_cache.resident_bytes() / 1024 / 1024:.1f} MB in memory)")
+        return clip
+
+    def _play(self, key, audio_data, stop=None):
+        """
+        Play MP3 bytes: decoded once and replayed from memory if possible, else
+        through pygame. Returns False if neither could play it.
+        """
+        clip = self._decode(key, audio_data) if self.pcm_cache is not None else None
+        if clip is not None:
+            try:
+                self._play_clip(clip, stop)
+                return True
+            except Exception as e:
+                print(f"⚠️ PCM playback failed ({e}), using pygame")
+        return self._play_audio(audio_data, stop)
+
+    def _remember(self, key, samples):
+        """Keep PCM that arrived from ElevenLabs, so it replays without another request"""
+        if self.pcm_cache is not None and samples:
+            self.pcm_cache.put(key, PCMClip(samples, self.stream_rate))
+
+    def pcm_stats(self):
+        """Decode count and time, hit rate and resident memory of the decoded-audio cache"""
+        return self.pcm_cache.report() if self.pcm_cache is not None else {}
+
+    def _stream_speech(self, text, stop=None, timeout=None):
+        """
+        Speak text while it downloads. Returns the tier that served it
+        ("cache" or "stream"), or None if nothing could be played this way
+        (no API key, request failed or too slow, no output device), so the
+        caller can fall back to another tier.
+        """
+        key = cache_key(self.voice_id, self.model_id, self.voice_settings, text, self.stream_format)
+        clip_key = cache_key(self.voice_id, self.model_id, self.voice_settings, text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached:
+            self._remember(clip_key, cached)
+            try:
+                self._play_clip(PCMClip(cached, self.stream_rate), stop)
+            except Exception as e:
+                print(f"✗ Cached PCM playback error: {e}")
+                return None
+            return "cache"
+        if not self.api_key:
+            return None
+
+        received = []
+        def collect(chunks):
+            for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+            # Only complete clips are cached
+            samples = b"".join(received)
+            self._remember(clip_key, samples)
+            if self.cache is not None:
+                self.cache.put(key, samples, text=text, voice_id=self.voice_id)
+
+        try:
+            self._play_pcm(collect(self._synthesize_stream(text, timeout=timeout)), stop)
+        except Exception as e:
+            print(f"✗ Streaming TTS error: {e}")
+        return "stream" if received else None
+
+    def _generate_within(self, text, budget_s):
+        """
+        _generate_speech, but give up after budget_s seconds. The download is
+        started even with no budget left, and carries on into the cache.
+        """
+        future = _remote_executor.submit(self._generate_speech, text)
+        try:
+            return future.result(timeout=max(budget_s, 0))
+        except FutureTimeoutError:
+            print(f"⏰ ElevenLabs missed the {self.deadline_ms:.0f} ms TTS budget")
+            return None
+
+    def _served(self, tier, message, latency_s):
+        latency_ms = latency_s * 1000
+        self.tier_stats[tier] += 1
+        self.utterances.append((tier, latency_ms, message))
+        if tier != "silent":
+            print(f"🗣️ Served by {tier} in {latency_ms:.0f} ms")
+
+    def tier_summary(self):
+        """{tier: {"count", "p50_ms", "max_ms"}} over recent utterances"""
+        summary = {}
+        for tier in TIERS:
+            latencies = sorted(latency for served, latency, _ in self.utterances if served == tier)
+            if latencies:
+                summary[tier] = {
+                    "count": self.tier_stats[tier],
+                    "p50_ms": statistics.median(latencies),
+                    "max_ms": latencies[-1],
+                }
+        return summary
+
+    def speak(self, message, stop=None):
+        """
+        Say a message through the first tier that can start in time: the
+        audio cache, ElevenLabs (streamed or in full) within the
+        ELDA_TTS_DEADLINE_MS budget, then the offline voice. Blocks until it
+        has been said; setting `stop` cuts it off.
+        """
+        print(f"🔊 Elda announcing: {message}")
+        stop = stop or threading.Event()
+        started = time.perf_counter()
+        self._first_audio_at = None
+
+        def budget_left():
+            return self.deadline_ms / 1000 - (time.perf_counter() - started)
+
+        # A tier is only counted once its playback worked; a failed one falls through to the next
+        mp3_key = cache_key(self.voice_id, self.model_id, self.voice_settings, message)
+        clip = self.pcm_cache.get(mp3_key) if self.pcm_cache is not None else None
+        if clip is not None:
+            try:
+                finished = self._play_clip(clip, stop)
+            except Exception as e:
+                print(f"⚠️ PCM playback failed ({e}), using pygame")
+            else:
+                self._served("memory", message, (self._first_audio_at or time.perf_counter()) - started)
+                return finished
+
+        cached = self.cache is not None and mp3_key in self.cache
+        if self.streaming and not cached:
+            # Leave part of the budget, so a stream that is slow to start still gets the clip downloaded
+            tier = self._stream_speech(message, stop, timeout=max(budget_left() * STREAM_SHARE, 0.05))
+            if tier:
+                self._served(tier, message, (self._first_audio_at or time.perf_counter()) - started)
+                return True
+
+        if stop.is_set():
+            return False
+        audio_data = self._generate_within(message, budget_left()) if not cached else self._generate_speech(message)
+        if stop.is_set():
+            return False
+        if audio_data:
+            ready = time.perf_counter()
+            if self._play(mp3_key, audio_data, stop):
+                self._served("cache" if cached else "remote", message, ready - started)
+                return True
+
+        if self.local_voice is not None and self.local_voice.available:
+            print("🔈 Falling back to the offline voice")
+            ready = time.perf_counter()
+            if self.local_voice.speak(message, stop) or stop.is_set():
+                self._served("local", message, ready - started)
+                return not stop.is_set()
+        self._served("silent", message, time.perf_counter() - started)
+        return False
     
     def announce_task_completion(self, task_description):
         """Announce that a task has been completed"""
         message = f"I've successfully completed the task: {task_description}"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
-        else:
+        if not self.speak(message):
             print("⚠️ Could not generate speech, falling back to text only")
     
     def introduce_myself(self):
-        message = "Hi I'm Elda, your personal digital assistant. How can I help you?"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        message = INTRODUCTION
+        self.speak(message)
     
     def announce_brightness_change(self, action):
         """Announce brightness adjustment"""
         message = f"I've {action} your screen brightness"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        self.speak(message)
     
     def announce_volume_change(self, action):
         """Announce volume adjustment"""
         message = f"I've {action} your volume"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        self.speak(message)
     
     def announce_zoom_change(self, action):
         """Announce zoom adjustment"""
         message = f"I've {action} the zoom level"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        self.speak(message)
+    
+    def announce_actions(self, actions):
+        """Confirm one or more completed actions in a single sentence"""
+        message = action_message(actions)
+        self.speak(message)
     
     def announce_how_to_triggered(self):
         """Announce that a how-to guide is being displayed"""
-        message = "I'm showing you a helpful guide for that task"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        message = HOW_TO_MESSAGE
+        self.speak(message)
     
     def announce_error(self, error_description):
         """Announce when an error occurs"""
-        message = f"I encountered an issue: {error_description}"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        message = error_message(error_description)
+        self.speak(message)
     
     def announce_listening(self):
         """Announce that Elda is ready to listen"""
-        message = "I'm listening, how can I help you?"
-        print(f"🔊 Elda announcing: {message}")
-        
-        audio_data = self._generate_speech(message)
-        if audio_data:
-            self._play_audio(audio_data)
+        message = LISTENING_MESSAGE
+        self.speak(message)
     
     def test_tts(self):
         """Test the TTS system"""
@@ -170,12 +544,11 @@ class EldaTTSAnnouncer:
         
         url = f"{self.base_url}/voices"
         headers = {
-            "Accept": "application/json",
-            "xi-api-key": self.api_key
+            "Accept": "application/json"
         }
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url, headers=headers)
             response.raise_for_status()
             voices = response.json().get("voices", [])
             
@@ -189,46 +562,74 @@ class EldaTTSAnnouncer:
             return []
 
 
-# Convenience functions for easy integration
+# Convenience functions for easy integration. They queue the announcement
+# for the playback worker and return its future instead of waiting for it.
 def announce_task_completion(task_description):
     """Convenience function to announce task completion"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_task_completion(task_description)
+    return announce(f"I've successfully completed the task: {task_description}")
 
 def announce_brightness_change(action):
     """Convenience function to announce brightness change"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_brightness_change(action)
+    return announce(f"I've {action} your screen brightness")
 
 def announce_volume_change(action):
     """Convenience function to announce volume change"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_volume_change(action)
+    return announce(f"I've {action} your volume")
 
 def announce_zoom_change(action):
     """Convenience function to announce zoom change"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_zoom_change(action)
+    return announce(f"I've {action} the zoom level")
+
+def announce_actions(actions):
+    """Convenience function to confirm several actions at once"""
+    return announce(action_message(actions))
 
 def announce_how_to_triggered():
     """Convenience function to announce how-to guide"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_how_to_triggered()
+    return announce(HOW_TO_MESSAGE, PRIORITY_INFO)
 
 def announce_error(error_description):
-    """Convenience function to announce errors"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_error(error_description)
+    """Convenience function to announce errors; these jump ahead of queued confirmations"""
+    return announce(error_message(error_description), PRIORITY_ERROR)
 
 def announce_listening():
     """Convenience function to announce listening status"""
-    announcer = EldaTTSAnnouncer()
-    announcer.announce_listening()
+    return announce(LISTENING_MESSAGE, PRIORITY_INFO)
 
 def introduce_myself():
     """Introduce Elda"""
-    announcer = EldaTTSAnnouncer()
-    announcer.introduce_myself()
+    return announce(INTRODUCTION, PRIORITY_INFO)
+
+def prewarm(actions=(), errors=(), cache=None):
+    """
+    Synthesize every fixed announcement, plus confirmations for the given
+    actions and error descriptions, so they later play from the cache.
+    Phrases already cached are skipped. The shared announcer also decodes
+    them into memory, so even their first playback needs no decode.
+    """
+    announcer = EldaTTSAnnouncer(cache=cache) if cache is not None else get_announcer()
+    if announcer.cache is None:
+        print("⚠️ TTS cache disabled, nothing to prewarm")
+        return 0
+
+    phrases = [INTRODUCTION, HOW_TO_MESSAGE, LISTENING_MESSAGE]
+    phrases += [action_message([action]) for action in actions]
+    phrases += [error_message(error) for error in errors]
+
+    started = time.perf_counter()
+    synthesized = 0
+    decode = cache is None and announcer.pcm_cache is not None
+    for text in phrases:
+        key = cache_key(announcer.voice_id, announcer.model_id, announcer.voice_settings, text)
+        if key not in announcer.cache and announcer._generate_speech(text):
+            synthesized += 1
+        if decode:
+            audio_data = announcer.cache.get(key)
+            if audio_data:
+                announcer._decode(key, audio_data)
+    print(f"🔥 TTS cache prewarmed: {synthesized} new of {len(phrases)} phrases "
+          f"in {time.perf_counter() - started:.1f}s")
+    return synthesized
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+"""
+Elda TTS Audio Cache
+Content-addressed disk cache for synthesized speech. Announcements are
+keyed by everything that changes the audio (voice, model, voice settings,
+format and text), so a repeated phrase plays without touching the network.
+Least recently used files are evicted once the cache outgrows its size bound.
+Decoded sample buffers of recent phrases are also kept in memory, so they
+replay without decoding again.
+
+Usage:
+    python tts_cache.py list
+    python tts_cache.py stats
+    python tts_cache.py purge                   # everything
+    python tts_cache.py purge --older-than 30   # entries unused for 30 days
+    python tts_cache.py prewarm                 # synthesize every known announcement
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_DIR = os.getenv("ELDA_TTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "elda", "tts"))
+DEFAULT_MAX_MB = float(os.getenv("ELDA_TTS_CACHE_MB", "50"))
+DEFAULT_PCM_MAX_MB = float(os.getenv("ELDA_TTS_PCM_CACHE_MB", "32"))
+
+
+def cache_key(voice_id, model_id, voice_settings, text, output_format="mp3"):
+    """Stable hash of every input that changes the synthesized audio"""
+    payload = json.dumps(
+        [voice_id, model_id, voice_settings, output_format, text], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TTSAudioCache:
+    """Audio files named by content hash, with an SQLite index for LRU eviction"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or DEFAULT_DIR
+        self.max_bytes = int(max_bytes if max_bytes is not None else DEFAULT_MAX_MB * 1024 * 1024)
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, text TEXT, voice_id TEXT, size INTEGER, created REAL, used REAL)"
+        )
+        self._drop_missing()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _drop_missing(self):
+        """Forget index rows whose audio file was deleted behind our back"""
+        keys = [row[0] for row in self._db.execute("SELECT key FROM entries")]
+        missing = [(key,) for key in keys if not os.path.exists(self._path(key))]
+        if missing:
+            with self._db:
+                self._db.executemany("DELETE FROM entries WHERE key = ?", missing)
+
+    def get(self, key):
+        """Cached audio bytes, or None"""
+        with self._lock:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            with self._db:
+                self._db.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+            return data
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, data, text="", voice_id=""):
+        if not data:
+            return
+        with self._lock:
+            # Write then rename so a crash never leaves a truncated file under a valid key
+            temp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+
+            now = time.time()
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, text, voice_id, len(data), now, now),
+                )
+            self.stats["writes"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits (lock held)"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY used ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def _remove(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        with self._db:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def total_bytes(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def entries(self):
+        """[(key, text, voice_id, size, created, used)], most recently used first"""
+        return self._db.execute(
+            "SELECT key, text, voice_id, size, created, used FROM entries ORDER BY used DESC"
+        ).fetchall()
+
+    def purge(self, older_than_seconds=None):
+        """Remove every entry, or only those unused for longer than the given age; returns the count"""
+        with self._lock:
+            if older_than_seconds is None:
+                keys = [row[0] for row in self._db.execute("SELECT key FROM entries")]
+            else:
+                cutoff = time.time() - older_than_seconds
+                keys = [row[0] for row in self._db.execute("SELECT key FROM entries WHERE used < ?", (cutoff,))]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class PCMClip:
+    """Interleaved 16-bit samples, ready to write to an output stream"""
+
+    __slots__ = ("samples", "samplerate", "channels")
+
+    def __init__(self, samples, samplerate, channels=1):
+        self.samples = samples
+        self.samplerate = samplerate
+        self.channels = channels
+
+    @property
+    def nbytes(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        return len(self.samples) / (2 * self.channels * self.samplerate)
+
+
+class DecodedAudioCache:
+    """PCMClips in memory by cache key; least recently used are dropped past max_bytes"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = int(max_bytes if max_bytes is not None else DEFAULT_PCM_MAX_MB * 1024 * 1024)
+        self.stats = {"hits": 0, "misses": 0, "decodes": 0, "decode_ms": 0.0, "evictions": 0}
+        self._clips = OrderedDict()
+        self._resident = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The cached clip, or None"""
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is None:
+                self.stats["misses"] += 1
+                return None
+            self._clips.move_to_end(key)
+            self.stats["hits"] += 1
+            return clip
+
+    def put(self, key, clip, decode_ms=None):
+        """Keep a clip; pass decode_ms when it was just decoded so decode cost is tracked"""
+        if clip.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if decode_ms is not None:
+                self.stats["decodes"] += 1
+                self.stats["decode_ms"] += decode_ms
+            previous = self._clips.pop(key, None)
+            if previous is not None:
+                self._resident -= previous.nbytes
+            self._clips[key] = clip
+            self._resident += clip.nbytes
+            while self._resident > self.max_bytes:
+                _, evicted = self._clips.popitem(last=False)
+                self._resident -= evicted.nbytes
+                self.stats["evictions"] += 1
+
+    def resident_bytes(self):
+        return self._resident
+
+    def report(self):
+        """Counters plus clip count and resident memory"""
+        with self._lock:
+            return {**self.stats, "clips": len(self._clips), "resident_mb": self._resident / 1024 / 1024}
+
+    def __len__(self):
+        return len(self._clips)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or purge Elda's TTS audio cache")
+    parser.add_argument("--dir", help=f"cache directory (default {DEFAULT_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show cached phrases")
+    commands.add_parser("stats", help="show entry count and size")
+    purge_parser = commands.add_parser("purge", help="delete cached audio")
+    purge_parser.add_argument("--older-than", type=float, metavar="DAYS", help="only entries unused for this long")
+    commands.add_parser("prewarm", help="synthesize every known announcement now")
+    args = parser.parse_args()
+
+    cache = TTSAudioCache(args.dir)
+    if args.command == "list":
+        for key, text, voice_id, size, created, used in cache.entries():
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(used))
+            print(f"{key[:12]}  {size / 1024:>7.1f} KB  {last_used}  {voice_id}  {text}")
+    elif args.command == "stats":
+        print(f"📦 {len(cache)} phrases, {cache.total_bytes() / 1024 / 1024:.2f} MB "
+              f"of {cache.max_bytes / 1024 / 1024:.0f} MB in {cache.directory}")
+    elif args.command == "purge":
+        older_than = args.older_than * 24 * 3600 if args.older_than is not None else None
+        print(f"🗑️ Removed {cache.purge(older_than)} cached phrases")
+    elif args.command == "prewarm":
+        import tts_announcer
+        from speech2text.command_handlers import COMMON_CONFIRMATIONS, ERROR_ACTIVITIES
+        tts_announcer.prewarm(COMMON_CONFIRMATIONS, ERROR_ACTIVITIES.values(), cache=cache)
@@ -0,0 +1,51 @@
+"""
+Elda Offline Voice
+Last-resort speech that needs no network: macOS `say`, or espeak elsewhere.
+It sounds worse than ElevenLabs but starts in milliseconds, so a slow or
+unreachable API never leaves the user waiting in silence.
+"""
+
+import os
+import shutil
+import subprocess
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOCAL_VOICE = os.getenv("ELDA_TTS_LOCAL_VOICE")  # e.g. "Samantha" for `say -v`
+ENGINES = ("say", "espeak-ng", "espeak")
+
+
+class LocalVoice:
+    """Speaks through the first offline synthesizer found on PATH"""
+
+    def __init__(self, voice=None):
+        self.voice = voice or LOCAL_VOICE
+        self.engine = next((path for path in map(shutil.which, ENGINES) if path), None)
+
+    @property
+    def available(self):
+        return self.engine is not None
+
+    def command(self, text):
+        args = [self.engine]
+        if self.voice:
+            args += ["-v", self.voice]
+        return args + [text]
+
+    def speak(self, text, stop):
+        """Say text, blocking until done; setting `stop` cuts it off. Returns True if it finished."""
+        if not self.available:
+            return False
+        try:
+            process = subprocess.Popen(self.command(text), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"✗ Offline voice error: {e}")
+            return False
+        while process.poll() is None:
+            if stop.wait(0.02):
+                process.terminate()
+                process.wait()
+                return False
+        return process.returncode == 0
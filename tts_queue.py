@@ -0,0 +1,169 @@
+"""
+Elda Announcement Queue
+Speaks announcements on a background worker so command handling never waits
+for Elda to finish talking. Announcements are ordered by priority (errors
+before confirmations before everything else), each one can be cancelled on
+its own, and barge_in() silences Elda the moment the wake word is heard again.
+A message that is already waiting in the queue isn't queued a second time.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+PRIORITY_ERROR = 0
+PRIORITY_CONFIRMATION = 1
+PRIORITY_INFO = 2
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+class Announcement(Future):
+    """
+    A queued utterance. Resolves to True once it has been spoken in full and
+    False if it was cut off or could not be synthesized. cancel() also stops
+    an announcement that is already playing.
+    """
+
+    def __init__(self, message, priority, speak=None):
+        super().__init__()
+        self.message = message
+        self.priority = priority
+        self.speak = speak  # overrides the queue's speaker, e.g. to read a long text
+        self.generation = 0
+        self.stop = threading.Event()
+
+    def cancel(self):
+        self.stop.set()
+        return super().cancel()
+
+
+class AnnouncementQueue:
+    """Priority queue of announcements drained by one playback thread"""
+
+    def __init__(self, speak=None):
+        # speak(message, stop) -> bool; the shared announcer unless given
+        self._speak = speak
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()  # FIFO within a priority
+        self._current = None
+        self._generation = 0  # bumped by barge_in; older announcements are dropped
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = 0
+        self._waiting = {}  # (priority, message) -> announcement not yet started
+        self._lock = threading.Lock()
+        self.stats = {"queued": 0, "spoken": 0, "interrupted": 0, "cancelled": 0, "barge_ins": 0,
+                      "deduplicated": 0}
+        self._thread = threading.Thread(target=self._run, name="announcer", daemon=True)
+        self._thread.start()
+
+    def submit(self, message, priority=PRIORITY_CONFIRMATION, speak=None):
+        """
+        Queue a message and return its Announcement future. The same message
+        still waiting at the same priority is returned instead of queueing it
+        again; one with its own speaker (e.g. a text being read) never is.
+        """
+        key = (priority, message)
+        with self._lock:
+            waiting = self._waiting.get(key) if speak is None else None
+            if waiting is not None and not waiting.done() and waiting.generation == self._generation:
+                self.stats["deduplicated"] += 1
+                return waiting
+            announcement = Announcement(message, priority, speak)
+            if speak is None:
+                self._waiting[key] = announcement
+            announcement.generation = self._generation
+            self._pending += 1
+            self._idle.clear()
+            self.stats["queued"] += 1
+        self._queue.put((priority, next(self._order), announcement))
+        return announcement
+
+    def barge_in(self):
+        """Stop the current announcement and drop everything queued before now"""
+        with self._lock:
+            self._generation += 1
+            current = self._current
+            dropped = self._pending - (current is not None)
+            self.stats["barge_ins"] += 1
+        if current is not None or dropped:
+            print(f"✋ Barge-in: stopped speaking, dropping {dropped} queued announcements")
+        if current is not None:
+            current.cancel()
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or playing; returns False on timeout"""
+        return self._idle.wait(timeout)
+
+    def _finished(self):
+        with self._lock:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.set()
+
+    def _speaker(self):
+        if self._speak is None:
+            import tts_announcer  # pulls in pygame, so only on the worker
+            self._speak = tts_announcer.get_announcer().speak
+        return self._speak
+
+    def _run(self):
+        while True:
+            _, _, announcement = self._queue.get()
+            with self._lock:
+                key = (announcement.priority, announcement.message)
+                if self._waiting.get(key) is announcement:
+                    del self._waiting[key]
+                if announcement.generation < self._generation:
+                    announcement.cancel()
+                if announcement.set_running_or_notify_cancel():
+                    self._current = announcement
+                else:
+                    self.stats["cancelled"] += 1
+            if self._current is not announcement:
+                self._finished()
+                continue
+
+            started = time.perf_counter()
+            try:
+                speak = announcement.speak or self._speaker()
+                spoken = speak(announcement.message, stop=announcement.stop)
+            except Exception as e:
+                print(f"✗ Announcement failed: {e}")
+                spoken = False
+            interrupted = announcement.stop.is_set()
+
+            with self._lock:
+                self._current = None
+                if interrupted:
+                    self.stats["interrupted"] += 1
+                elif spoken:
+                    self.stats["spoken"] += 1
+            if interrupted:
+                print(f"✋ Announcement cut off after {(time.perf_counter() - started) * 1000:.0f} ms")
+            announcement.set_result(bool(spoken) and not interrupted)
+            self._finished()
+
+
+def get_queue():
+    """The process-wide announcement queue, started on first use"""
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            _shared_queue = AnnouncementQueue()
+        return _shared_queue
+
+
+def announce(message, priority=PRIORITY_CONFIRMATION, speak=None):
+    """Queue a message on the shared queue; returns its Announcement future"""
+    return get_queue().submit(message, priority, speak)
+
+
+def barge_in():
+    """Silence Elda, e.g. because the wake word was heard mid-sentence"""
+    if _shared_queue is not None:
+        _shared_queue.barge_in()
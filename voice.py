@@ -1,63 +1,65 @@
 import pvporcupine
 import os
-import sounddevice as sd
-import struct
+import threading
 from dotenv import load_dotenv
-from speech2text.stt_capture import listen_and_process
+from speech2text.mic_stream import MicrophoneStream
+from speech2text.stt_capture import listen_and_process, warm_up
+from wake_word import WakeWordDetector
+from tts_queue import barge_in
 
 load_dotenv()
 ACCESS_KEY = os.getenv("ACCESS_KEY")
+WARMUP = os.getenv("ELDA_WARMUP", "background")  # "background" or "off" (build everything on first use)
 
 elda = pvporcupine.create(
-    access_key=ACCESS_KEY, 
+    access_key=ACCESS_KEY,
     keyword_paths=["hello_elda.ppn"]
 )
 
-# Flag to trigger processing outside the callback
-wake_word_detected = False
-
-def audio_callback(indata, frames, time, status):
-    global wake_word_detected
-    
-    if status:
-        print(status)
-    
-    pcm = struct.unpack_from("h" * elda.frame_length, indata)
-    result = elda.process(pcm)
-    
-    if result >= 0:
+def show_listening():
+    """Show listening state in Electron (runs on the detector's event worker)"""
+    from websocket_client import trigger_electron_listening
+    trigger_electron_listening()
+
+# One input stream for the whole session; wake word detection and command
+# capture both read from its ring buffer
+mic = MicrophoneStream(samplerate=elda.sample_rate, blocksize=elda.frame_length)
+mic.start()
+detector = WakeWordDetector(elda, mic, on_detected=show_listening).start()
+
+# Main loop
+print("👂 Listening for 'Hey Elda'... Press Ctrl+C to stop.")
+
+# API clients, pygame and friends load while we are already listening
+if WARMUP == "background":
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+try:
+    while True:
+        # Wakes the moment the detector fires; no polling
+        detector.detected.wait()
         print("🎤 Wake word 'Hey Elda' detected!")
-        wake_word_detected = True
-        # Show listening state immediately
+        # Announcements play in the background; stop talking and listen
+        barge_in()
+
+        # Capture starts where the wake word ended; anything said in the
+        # meantime is still waiting in the ring buffer
+        print("Processing command...")
         try:
-            from websocket_client import trigger_electron_listening
-            trigger_electron_listening()
+            listen_and_process(mic=mic, start=detector.detected_at)
         except Exception as e:
-            print(f"⚠️ Error showing listening state: {e}")
+            print(f"⚠️ Error processing command: {e}")
 
-# Main loop
-print("👂 Listening for 'Hey Elda'... Press Ctrl+C to stop.")
+        stats = mic.stats()
+        if stats["input_overflows"] or stats["input_underflows"] or detector.reader.dropped:
+            print(f"⚠️ Audio xruns: {stats['input_overflows']} overflows, "
+                  f"{stats['input_underflows']} underflows, {detector.reader.dropped} samples dropped")
 
-while True:
-    wake_word_detected = False
-    
-    # Listen for wake word
-    with sd.RawInputStream(
-        samplerate=elda.sample_rate,
-        blocksize=elda.frame_length,
-        dtype="int16",
-        channels=1,
-        callback=audio_callback,
-    ):
-        # Wait for wake word detection
-        while not wake_word_detected:
-            sd.sleep(100)
-    
-    # Stream is now closed, safe to record
-    print("Processing command...")
-    try:
-        listen_and_process()
-    except Exception as e:
-        print(f"⚠️ Error processing command: {e}")
-    
-    print("Ready for next wake word...\n")
\ No newline at end of file
+        detector.rearm()
+        print("Ready for next wake word...\n")
+except KeyboardInterrupt:
+    print("\n👋 Stopping Elda")
+finally:
+    detector.stop()
+    mic.close()
+    elda.delete()
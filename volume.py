@@ -1,34 +1,146 @@
-import subprocess
+"""
+System volume control
+Keeps a shadow copy of the output volume so status questions and relative
+changes don't have to read it from macOS first. The copy is trusted for
+ELDA_VOLUME_TTL seconds and corrected whenever a write finds the real level
+differed. Changes that arrive while one is being applied are merged into a
+single net change.
+"""
+
+import os
 import re
+import threading
+import time
+from concurrent.futures import Future
+
+from script_executor import batch
+
+VOLUME_TTL = float(os.getenv("ELDA_VOLUME_TTL", "10"))  # seconds the cached level is trusted
+
+
+def _run_step(script):
+    """Run a one-step batch and return its result, raising if the step failed"""
+    step = script.run()[0]
+    if not step.ok:
+        raise RuntimeError(f"{step.step} failed: {step.value}")
+    return step.value
+
+
+def _levels(value):
+    before, after = value.split("->")
+    return int(before), int(after)
+
+
+class VolumeState:
+    """Last known output volume, reconciled lazily with the system"""
+
+    def __init__(self, ttl=None):
+        self.ttl = VOLUME_TTL if ttl is None else ttl
+        self.level = None
+        self.checked_at = 0.0
+        self.stats = {"reads": 0, "writes": 0, "cache_hits": 0, "coalesced": 0, "mismatches": 0}
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()  # one osascript call at a time
+        self._pending = 0                 # net change waiting for the next write
+        self._next = None                 # Future shared by the changes in that write
+
+    def fresh(self):
+        return self.level is not None and time.monotonic() - self.checked_at < self.ttl
+
+    def _store(self, level):
+        self.level = level
+        self.checked_at = time.monotonic()
+
+    def get(self):
+        """Current level; only asks macOS when the cached one is stale"""
+        with self._io_lock:
+            if self.fresh():
+                self.stats["cache_hits"] += 1
+                return self.level
+            self.stats["reads"] += 1
+            self._store(int(_run_step(batch().get_volume())))
+            return self.level
+
+    def set(self, level):
+        """Set an absolute level in one write; returns (before, after)"""
+        with self._io_lock:
+            self.stats["writes"] += 1
+            before, after = _levels(_run_step(batch().exchange_volume(level)))
+            self._store(after)
+            return before, after
+
+    def adjust(self, change):
+        """
+        Change the level by a relative amount; returns (before, after).
+        Changes requested while another write is in flight join the next
+        write, so N rapid "louder"s cost at most two osascript calls.
+        """
+        with self._lock:
+            self._pending += change
+            joined = self._next is not None
+            if not joined:
+                self._next = Future()
+            future = self._next
+        if joined:
+            self.stats["coalesced"] += 1
+            return future.result()
+
+        with self._io_lock:
+            with self._lock:
+                delta, self._pending, self._next = self._pending, 0, None
+            try:
+                future.set_result(self._apply(delta))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _apply(self, delta):
+        """Write cached level + delta as an absolute level (io lock held)"""
+        if not self.fresh():
+            # Read and write in the same script, which also refreshes the cache
+            self.stats["writes"] += 1
+            before, after = _levels(_run_step(batch().adjust_volume(delta)))
+            self._store(after)
+            return before, after
+        if not delta:
+            self.stats["cache_hits"] += 1
+            return self.level, self.level
+
+        expected = self.level
+        self.stats["writes"] += 1
+        before, after = _levels(_run_step(batch().exchange_volume(max(0, min(100, expected + delta)))))
+        if before != expected:
+            # Changed behind our back (e.g. the volume keys); redo the change from the real level
+            self.stats["mismatches"] += 1
+            target = max(0, min(100, before + delta))
+            if target != after:
+                self.stats["writes"] += 1
+                _, after = _levels(_run_step(batch().exchange_volume(target)))
+        self._store(after)
+        return before, after
+
+
+volume_state = VolumeState()
+
 
 def get_current_volume():
     """Get the current system volume (0-100)"""
-    result = subprocess.run(
-        ["osascript", "-e", "output volume of (get volume settings)"],
-        capture_output=True,
-        text=True
-    )
-    return int(result.stdout.strip())
+    return volume_state.get()
+
 
 def set_volume(level):
     """Set the system volume to a specific level (0-100)"""
-    level = max(0, min(100, level))  # Clamp between 0-100
-    subprocess.run(
-        ["osascript", "-e", f"set volume output volume {level}"],
-        check=True
-    )
+    _, level = volume_state.set(level)
     print(f"Volume set to {level}%")
+    return level
+
 
 def adjust_volume(change):
     """Adjust volume by a relative amount (+/- percentage)"""
-    current = get_current_volume()
-    new_volume = current + change
-    new_volume = max(0, min(100, new_volume))
-    subprocess.run(
-        ["osascript", "-e", f"set volume output volume {new_volume}"],
-        check=True
-    )
+    current, new_volume = volume_state.adjust(change)
     print(f"Volume adjusted from {current}% to {new_volume}%")
+    return new_volume
+
 
 def parse_command(command):
     """Parse text command and adjust volume accordingly"""
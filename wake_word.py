@@ -0,0 +1,104 @@
+"""
+Wake word detection on the shared microphone stream
+Runs Porcupine on its own thread and hands detections to the main loop and
+the Electron notifier without ever blocking the audio path
+"""
+
+import queue
+import threading
+from ctypes import POINTER, byref, c_int, c_short
+
+import numpy as np
+
+
+def make_frame_processor(porcupine, frame):
+    """
+    Returns a process() callable that hands the preallocated int16 frame to
+    Porcupine by pointer, skipping the per-frame tuple/ctypes array that
+    Porcupine.process builds. Falls back to the public API if the internals change.
+    """
+    try:
+        process_func = porcupine._process_func
+        handle = porcupine._handle
+        success = type(porcupine).PicovoiceStatuses.SUCCESS
+    except AttributeError:
+        return lambda: porcupine.process(frame)
+
+    frame_ptr = frame.ctypes.data_as(POINTER(c_short))
+    result = c_int()
+    result_ref = byref(result)
+
+    def process():
+        status = process_func(handle, frame_ptr, result_ref)
+        if status is not success:
+            raise RuntimeError(f"Porcupine process failed: {status}")
+        return result.value
+
+    return process
+
+
+class WakeWordDetector:
+    """Scans the microphone ring buffer for the wake word on a background thread"""
+
+    def __init__(self, porcupine, mic, on_detected=None):
+        self.porcupine = porcupine
+        self.mic = mic
+        self.reader = mic.reader()
+        self.frame = np.zeros(porcupine.frame_length, dtype=np.int16)
+        self._process = make_frame_processor(porcupine, self.frame)
+
+        # Set when the wake word fires; the main loop waits on this instead of polling
+        self.detected = threading.Event()
+        self.detected_at = None
+        self._armed = threading.Event()
+        self._armed.set()
+        self._stopped = False
+
+        # Side effects (e.g. showing the listening UI) run on a worker thread
+        # so a slow WebSocket connect can never stall detection
+        self._events = queue.SimpleQueue()
+        self._on_detected = on_detected
+
+        self._thread = threading.Thread(target=self._run, name="wake-word", daemon=True)
+        self._worker = threading.Thread(target=self._drain_events, name="wake-word-events", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._worker.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._armed.set()
+        self._events.put(None)
+
+    def rearm(self):
+        """Resume scanning from live audio after a command has been handled"""
+        self.detected.clear()
+        self.reader.seek_to_latest()
+        self._armed.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._armed.wait()
+            if self._stopped:
+                break
+            if not self.reader.read_into(self.frame, timeout=0.5):
+                continue
+            if self._process() >= 0:
+                # Pause until the main loop re-arms us so the command itself isn't scanned
+                self._armed.clear()
+                self.detected_at = self.reader.position
+                self.detected.set()
+                self._events.put_nowait("detected")
+
+    def _drain_events(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                break
+            if self._on_detected:
+                try:
+                    self._on_detected()
+                except Exception as e:
+                    print(f"⚠️ Error handling wake word event: {e}")
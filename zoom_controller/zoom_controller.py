@@ -1,16 +1,36 @@
 """
 Basic Zoom Test - Verify macOS zoom accessibility
-Run this first to make sure everything works
+Run this first to make sure everything works (from the repo root:
+python -m zoom_controller.zoom_controller)
 """
 
-import subprocess
+import math
+import os
+import statistics
 import time
+from collections import deque
+
+from script_executor import ScriptError, batch
+
+ZOOM_STEP = float(os.getenv("ELDA_ZOOM_STEP", "0.5"))  # magnification added by one Command+Option+=
+MAX_ZOOM = float(os.getenv("ELDA_MAX_ZOOM", "20"))
+STEP_DELAY = 0.05
+RESET_EXTRA_STEPS = 2  # zooming out at 1x is harmless, so a reset overshoots in case we drifted
+ZOOM_IN_KEY, ZOOM_OUT_KEY, ZOOM_TOGGLE_KEY = 24, 27, 28
 
 class ZoomController:
-    """Control macOS screen zoom via accessibility features"""
+    """
+    Control macOS screen zoom via accessibility features. Keep one for the
+    session: it tracks the magnification it has set, so it can go straight
+    to a level ("zoom to 2x") or back to 1x in a single script.
+    current_zoom is None when the level isn't known (e.g. after toggling
+    back to a magnification macOS remembered from before).
+    """
     
     def __init__(self):
         self.current_zoom = 1.0
+        self._toggled_from = None  # the level a toggle to 1x will come back to
+        self.timings = {}  # operation -> recent durations in ms
     
     def check_accessibility_permissions(self):
         """Check if Terminal has accessibility permissions"""
@@ -31,78 +51,98 @@ class ZoomController:
             print(f"✗ Error checking permissions: {e}")
             return False
     
+    def _run(self, script, action):
+        """Run a batch of key presses in one osascript call; True if every step worked"""
+        try:
+            results = script.run(timeout=5)
+        except ScriptError as e:
+            print(f"✗ {action} failed: {e}")
+            return False
+        for index, step in enumerate(results):
+            if not step.ok:
+                print(f"✗ {action} step {index + 1} failed: {step.value}")
+                return False
+        return True
+
     def zoom_toggle(self):
         """Test toggling zoom on/off"""
         print("Testing zoom toggle (Command+Option+8)...")
-        try:
-            result = subprocess.run([
-                'osascript',
-                '-e',
-                'tell application "System Events" to key code 28 using {command down, option down}'
-            ], capture_output=True, text=True, timeout=5)
-            
-            if result.returncode == 0:
-                print("✓ Zoom toggle successful")
-                return True
+        if self._run(batch().key_code(ZOOM_TOGGLE_KEY, ("command", "option")), "Zoom toggle"):
+            if self.current_zoom is not None and self.current_zoom > 1.0:
+                self._toggled_from, self.current_zoom = self.current_zoom, 1.0
             else:
-                print(f"✗ Zoom toggle failed: {result.stderr}")
-                return False
-        except subprocess.TimeoutExpired:
-            print("✗ Command timed out")
-            return False
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            return False
-    
+                # Back to the level before the last toggle off; unknown if we never saw it
+                self.current_zoom, self._toggled_from = self._toggled_from, None
+            print("✓ Zoom toggle successful")
+            return True
+        return False
+
+    def _zoom_steps(self, key, steps):
+        """All steps of a zoom change in one script, with a small delay between them"""
+        script = batch()
+        for i in range(steps):
+            if i:
+                script.delay(STEP_DELAY)
+            script.key_code(key, ("command", "option"))
+        return script
+
+    def _step(self, operation, steps, target=None):
+        """
+        Press zoom in (steps > 0) or out (steps < 0) in one script call,
+        then update the tracked level and timing
+        """
+        started = time.perf_counter()
+        key, action = (ZOOM_IN_KEY, "Zoom in") if steps > 0 else (ZOOM_OUT_KEY, "Zoom out")
+        ok = not steps or self._run(self._zoom_steps(key, abs(steps)), action)
+        if ok:
+            if steps:
+                self._toggled_from = None  # what a toggle comes back to is no longer known
+            if target is None and self.current_zoom is not None:
+                target = self.current_zoom + steps * ZOOM_STEP
+            self.current_zoom = None if target is None else max(1.0, min(MAX_ZOOM, target))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.timings.setdefault(operation, deque(maxlen=50)).append(elapsed_ms)
+        if ok:
+            level = "an unknown level" if self.current_zoom is None else f"{self.current_zoom:g}x"
+            print(f"✓ {operation} successful ({abs(steps)} steps, {elapsed_ms:.0f} ms, now {level})")
+        return ok
+
     def zoom_in(self, steps=3):
         """Zoom in with multiple steps for larger zoom"""
         print(f"\nZooming in {steps} steps (Command+Option+=)...")
-        try:
-            for i in range(steps):
-                result = subprocess.run([
-                    'osascript',
-                    '-e',
-                    'tell application "System Events" to key code 24 using {command down, option down}'
-                ], capture_output=True, text=True, timeout=5)
-                
-                if result.returncode != 0:
-                    print(f"✗ Zoom in step {i+1} failed: {result.stderr}")
-                    return False
-                
-                # Small delay between steps
-                import time
-                time.sleep(0.05)
-            
-            print(f"✓ Zoom in successful ({steps} steps)")
-            return True
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            return False
-    
+        return self._step("Zoom in", steps)
+
     def zoom_out(self, steps=3):
         """Zoom out with multiple steps for larger zoom reduction"""
         print(f"\nZooming out {steps} steps (Command+Option+-)...")
-        try:
-            for i in range(steps):
-                result = subprocess.run([
-                    'osascript',
-                    '-e',
-                    'tell application "System Events" to key code 27 using {command down, option down}'
-                ], capture_output=True, text=True, timeout=5)
-                
-                if result.returncode != 0:
-                    print(f"✗ Zoom out step {i+1} failed: {result.stderr}")
-                    return False
-                
-                # Small delay between steps
-                import time
-                time.sleep(0.05)
-            
-            print(f"✓ Zoom out successful ({steps} steps)")
-            return True
-        except Exception as e:
-            print(f"✗ Error: {e}")
+        return self._step("Zoom out", -steps)
+
+    def zoom_to(self, level):
+        """Go straight to a magnification (e.g. 2 for 2x) from the tracked level"""
+        level = max(1.0, min(MAX_ZOOM, float(level)))
+        if level <= 1.0:
+            return self.reset_zoom()
+        if self.current_zoom is None and not self.reset_zoom():
             return False
+        steps = round((level - self.current_zoom) / ZOOM_STEP)
+        print(f"\nZooming to {level:g}x ({steps:+d} steps)...")
+        return self._step("Zoom to", steps, target=self.current_zoom + steps * ZOOM_STEP)
+
+    def reset_zoom(self):
+        """Back to 1x, pressing zoom out a little more than the tracked level needs"""
+        # Without a tracked level, zoom out from the furthest macOS could be at
+        current = MAX_ZOOM if self.current_zoom is None else self.current_zoom
+        steps = math.ceil((current - 1.0) / ZOOM_STEP) + RESET_EXTRA_STEPS
+        print(f"\nResetting zoom ({steps} steps)...")
+        return self._step("Reset zoom", -steps, target=1.0)
+
+    def timing_report(self):
+        """{operation: {"count", "p50_ms", "max_ms"}} over recent operations"""
+        report = {}
+        for operation, durations in self.timings.items():
+            report[operation] = {"count": len(durations), "p50_ms": statistics.median(durations),
+                                 "max_ms": max(durations)}
+        return report
     
     def run_full_test(self):
         """Run complete test sequence"""